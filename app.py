@@ -1,13 +1,35 @@
 import streamlit as st
+import atexit
+import hashlib
 import random
-import json
 import time
-from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
-import re
+import uuid
+import zoneinfo
+from datetime import datetime
+from functools import wraps
+from components import cards
+from components.charts import (
+    activity_heatmap_figure,
+    pronunciation_scores_figure,
+    skill_points_pie_figure,
+    skill_radar_figure,
+    weekly_points_figure,
+)
+from utils import achievements, activity, metrics, points
+from utils.achievements import ACHIEVEMENTS, AchievementRules, AchievementTracker
+from utils.activity import ActivityRollups, day_labels
+from utils.auth import AuthError, create_identity_provider
+from utils.content import PACK_CACHE_SIZE, available_languages, has_language_pack, load_conversation_scenarios, load_language_pack
+from utils.conversation_engine import create_engine
+from utils.jobs import JobQueue, JobQueueFull
+from utils.points import PointsLedger
+from utils.pronunciation_log import PronunciationLog
+from utils.quiz import QuizGenerator
+from utils.reference_audio import create_audio_cache
+from utils.srs import ReviewScheduler
+from utils.streaks import StreakTracker, learner_now
+from utils.storage import ProfileStore, create_backend
+from utils.vocabulary import MasteredVocabulary, VocabularyIndex
 
 # Page configuration
 st.set_page_config(
@@ -93,102 +115,347 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'user_profile' not in st.session_state:
-    st.session_state.user_profile = {
+# Chat rendering window and stored history cap (messages)
+CHAT_WINDOW_SIZE = 20
+MAX_CHAT_HISTORY = 200
+
+# Gaps between interactions longer than this count as idle, not study time
+MAX_CREDITED_GAP_SECONDS = 120
+# Time spent is appended to the event log in chunks of at least this many seconds
+TIME_EVENT_MIN_SECONDS = 60
+
+# Session state persisted through the profile store
+PERSISTED_STATE_KEYS = ('user_profile', 'conversation_history')
+REVIEW_SCHEDULE_KEY_PREFIX = 'review_schedule:'
+
+# Badges shown under "Recent Achievements" on the dashboard
+RECENT_ACHIEVEMENT_LIMIT = 4
+
+# Questions per vocabulary quiz
+QUIZ_LENGTH = 5
+
+# Spaced repetition grade buttons: (label, SM-2 quality)
+REVIEW_GRADES = (("🔁 Again", 1), ("😓 Hard", 3), ("🙂 Good", 4), ("😎 Easy", 5))
+
+@st.cache_resource
+def get_profile_store():
+    """Process-wide store shared by every session"""
+    store = ProfileStore(create_backend())
+    atexit.register(store.close)
+    return store
+
+@st.cache_resource
+def get_identity_provider():
+    """Process-wide sign-in provider, or None for anonymous learners (LANGAPP_AUTH)"""
+    return create_identity_provider()
+
+def get_user_id():
+    """The signed-in learner's ID, or a stable anonymous ID kept in the URL"""
+    if 'user_id' not in st.session_state:
+        provider = get_identity_provider()
+        if provider is not None:
+            # Nothing below runs, and no profile is loaded, until the learner signs in
+            show_sign_in(provider)
+            st.stop()
+        user_id = st.query_params.get('uid')
+        if not user_id:
+            user_id = uuid.uuid4().hex
+            st.query_params['uid'] = user_id
+        st.session_state.user_id = user_id
+    return st.session_state.user_id
+
+def show_sign_in(provider):
+    """Sign-in and sign-up forms; a successful submit stores the user ID and reruns"""
+    st.markdown('<div class="main-header"><h1>🌍 AI Language Learning Companion</h1></div>', unsafe_allow_html=True)
+    sign_in_tab, sign_up_tab = st.tabs(["Sign in", "Create account"])
+    with sign_in_tab:
+        with st.form("sign_in"):
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
+            if st.form_submit_button("Sign in", type="primary"):
+                user_id = provider.authenticate(username, password)
+                if user_id is None:
+                    st.error("Unknown username or wrong password.")
+                else:
+                    st.session_state.user_id = user_id
+                    st.rerun()
+    with sign_up_tab:
+        with st.form("sign_up"):
+            username = st.text_input("Choose a username")
+            password = st.text_input("Choose a password", type="password")
+            if st.form_submit_button("Create account"):
+                try:
+                    st.session_state.user_id = provider.register(username, password)
+                except AuthError as exc:
+                    st.error(str(exc))
+                else:
+                    st.rerun()
+
+def sign_out():
+    """Save progress, then drop this session's learner state entirely"""
+    persist_session_state()
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    st.rerun()
+
+def new_user_profile():
+    """Profile defaults for a learner with no saved progress"""
+    return {
         'name': '',
         'native_language': 'English',
         'target_language': 'Spanish',
         'level': 'Beginner',
         'daily_goal': 20,
         'interests': [],
-        'streak': 0,
-        'total_points': 0,
+        'timezone': None,
         'lessons_completed': 0,
         'conversations_had': 0,
-        'pronunciation_scores': [],
-        'vocabulary_mastered': [],
         'last_login': datetime.now().isoformat()
     }
 
-if 'conversation_history' not in st.session_state:
-    st.session_state.conversation_history = []
+def persist_session_state():
+    """Stage persisted keys for the next background flush (no disk I/O here)"""
+    store = get_profile_store()
+    user_id = get_user_id()
+    for key in PERSISTED_STATE_KEYS:
+        store.stage(user_id, key, st.session_state[key])
+    stage_changed(store, user_id, 'activity_rollups', st.session_state.activity)
+    stage_changed(store, user_id, 'mastered_vocabulary', st.session_state.mastered)
+    stage_changed(store, user_id, 'pronunciation_log', st.session_state.pronunciation_log)
+    stage_changed(store, user_id, 'achievements', st.session_state.achievements)
+    stage_changed(store, user_id, 'points_ledger', st.session_state.points)
+    # Streaks take study time on every rerun, so they change (nearly) every time
+    store.stage(user_id, 'streaks', st.session_state.streaks.to_dict())
+    # Review queues can hold tens of thousands of cards; only serialize changed ones
+    for language, scheduler in st.session_state.review_schedulers.items():
+        stage_changed(store, user_id, REVIEW_SCHEDULE_KEY_PREFIX + language, scheduler)
+
+def stage_changed(store, user_id, key, component):
+    """Stage a versioned component only if it changed since it was last staged"""
+    staged_versions = st.session_state.staged_versions
+    if staged_versions.get(key) != component.version:
+        store.stage(user_id, key, component.to_dict())
+        staged_versions[key] = component.version
+
+def current_time():
+    """Now, in the learner's timezone; all day bucketing uses this"""
+    return learner_now(st.session_state.user_profile.get('timezone'))
+
+def mark_active_day(day):
+    """Count a learner's local day toward their streak"""
+    if st.session_state.streaks.record_activity(day):
+        update_achievements(achievements.STREAK_DAYS, st.session_state.streaks.current)
+
+def record_activity(kind, amount=1):
+    """Fold an event into today's rollup and append it to the event log"""
+    now = current_time()
+    st.session_state.activity.add(now.date(), kind, amount)
+    mark_active_day(now.date())
+    get_profile_store().append_event(get_user_id(), now.timestamp(), kind, amount)
+
+def award_points(source, amount=None):
+    """Credit points through the ledger and log the award; returns the amount credited"""
+    if amount is None:
+        amount = points.POINT_SOURCES[source].points
+    ledger = st.session_state.points
+    credited = ledger.award(source, amount, time.time())
+    if not credited:
+        st.toast("⏳ You're going fast! Points for this activity are paused for a moment.")
+        return 0
+    now = current_time()
+    st.session_state.activity.add(now.date(), activity.POINTS, credited)
+    mark_active_day(now.date())
+    get_profile_store().append_event(get_user_id(), now.timestamp(), f"{activity.POINTS}:{source}", credited)
+    update_achievements(achievements.TOTAL_POINTS, ledger.total)
+    return credited
+
+@st.cache_resource
+def get_achievement_rules():
+    """Achievement rules indexed by metric, compiled once per process"""
+    return AchievementRules(ACHIEVEMENTS)
+
+def update_achievements(metric, value):
+    """Report a changed metric; only the rules watching it are checked"""
+    for achievement in st.session_state.achievements.update(metric, value, time.time()):
+        st.toast(f"🏆 Achievement unlocked: {achievement.name}")
+
+def achievement_metrics():
+    """Current value of every metric achievements can watch"""
+    profile = st.session_state.user_profile
+    return {
+        achievements.TOTAL_POINTS: st.session_state.points.total,
+        achievements.LESSONS_COMPLETED: profile['lessons_completed'],
+        achievements.CONVERSATIONS_HAD: profile['conversations_had'],
+        achievements.WORDS_MASTERED: st.session_state.mastered.total(),
+        achievements.BEST_PRONUNCIATION_SCORE: st.session_state.pronunciation_log.max_score,
+        achievements.STREAK_DAYS: st.session_state.streaks.streak(current_time().date()),
+    }
+
+def track_time_spent():
+    """Credit the time since the previous interaction as study time"""
+    now = time.time()
+    last_interaction = st.session_state.get('last_interaction_at')
+    st.session_state.last_interaction_at = now
+    if last_interaction is None:
+        return
+    elapsed = min(now - last_interaction, MAX_CREDITED_GAP_SECONDS)
+    today = current_time().date()
+    st.session_state.streaks.add_time(today, elapsed)
+    # Rollups and the raw log get time in chunks of a minute or so, so a rerun
+    # that only adds study time doesn't make the rollups look changed
+    unlogged = st.session_state.get('unlogged_seconds', 0) + elapsed
+    if unlogged >= TIME_EVENT_MIN_SECONDS:
+        st.session_state.activity.add(today, activity.TIME_SPENT, unlogged)
+        get_profile_store().append_event(get_user_id(), now, activity.TIME_SPENT, round(unlogged, 1))
+        unlogged = 0
+    st.session_state.unlogged_seconds = unlogged
+
+def finish_run():
+    """Last step of every full or fragment rerun: stage progress and export metrics"""
+    persist_session_state()
+    exporter = get_metrics_exporter()
+    if exporter is not None:
+        exporter.flush()
+
+def interactive_fragment(fn):
+    """st.fragment for an interactive region, so its widgets rerun only that region
+
+    Widgets change state in on_click callbacks, which run before the fragment
+    reruns; a callback whose change shows elsewhere on the page (points,
+    progress) calls refresh_page() to have the whole page rerun instead. When
+    the fragment reruns on its own, the bookkeeping that render_app does on a
+    full rerun (study time, saving progress, metrics) is done here instead.
+    """
+    @wraps(fn)
+    def region(*args, **kwargs):
+        refresh = st.session_state.pop('refresh_page', False)
+        if st.session_state.get('full_rerun'):
+            return fn(*args, **kwargs)
+        if refresh:
+            st.rerun()
+        metrics.count_rerun(f"fragment:{fn.__name__}")
+        track_time_spent()
+        try:
+            with metrics.timed(f"fragment:{fn.__name__}"):
+                return fn(*args, **kwargs)
+        finally:
+            finish_run()
+    return st.fragment(region)
+
+def refresh_page():
+    """From a fragment's widget callback: rerun the whole page rather than just the fragment"""
+    st.session_state.refresh_page = True
+
+# Language content lives in per-language packs under data/languages, loaded on first use
+@st.cache_resource(max_entries=PACK_CACHE_SIZE)
+def get_vocabulary_index(language):
+    """Vocabulary index for a language, built once per process"""
+    pack = load_language_pack(language)
+    return VocabularyIndex(pack['vocabulary'], pack.get('translations'), pack.get('word_ids'))
+
+@st.cache_resource(max_entries=PACK_CACHE_SIZE)
+def get_quiz_generator(language):
+    """Quiz generator with distractor pools precomputed once per language"""
+    return QuizGenerator(get_vocabulary_index(language))
+
+def migrate_mastered_words(words, target_language):
+    """Map the old flat list of mastered words onto per-language word IDs"""
+    mastered = MasteredVocabulary()
+    languages = [target_language] + sorted(available_languages() - {target_language})
+    for word in words:
+        for language in languages:
+            if not has_language_pack(language):
+                continue
+            word_id = get_vocabulary_index(language).word_ids.get(word)
+            if word_id is not None:
+                mastered.add(language, word_id)
+                break
+    return mastered
+
+def migrate_pronunciation_history(scores, feedback):
+    """Replay the old unbounded score and feedback lists into a bounded log"""
+    log = PronunciationLog()
+    for score in scores:
+        log.record('conversation', None, score, 0.0)
+    for entry in feedback:
+        kind = next((key for key in entry if key not in ('score', 'timestamp')), None)
+        timestamp = datetime.fromisoformat(entry['timestamp']).timestamp() if 'timestamp' in entry else 0.0
+        log.record(kind, entry.get(kind), entry['score'], timestamp)
+    return log
+
+def migrate_points_ledger(total, profile):
+    """Seed a ledger from the old bare total, split across skills as the old pie estimated"""
+    estimate = (
+        st.session_state.mastered.total() * 20,
+        st.session_state.pronunciation_log.count * 15,
+        profile['conversations_had'] * 10,
+        profile['lessons_completed'] * 25
+    )
+    by_skill = {}
+    if total and sum(estimate):
+        by_skill = {skill: total * share // sum(estimate) for skill, share in zip(points.SKILLS, estimate)}
+        largest = max(by_skill, key=by_skill.get)
+        by_skill[largest] += total - sum(by_skill.values())
+    return PointsLedger(total, by_skill)
+
+# Initialize session state, loading saved progress once per session
+if 'user_profile' not in st.session_state:
+    saved_state = get_profile_store().load(get_user_id())
+    profile = new_user_profile()
+    profile.update(saved_state.get('user_profile', {}))
+    profile['last_login'] = datetime.now().isoformat()
+    legacy_mastered_words = profile.pop('vocabulary_mastered', [])
+    if 'mastered_vocabulary' in saved_state:
+        st.session_state.mastered = MasteredVocabulary.from_dict(saved_state['mastered_vocabulary'])
+    else:
+        st.session_state.mastered = migrate_mastered_words(legacy_mastered_words, profile['target_language'])
+    legacy_scores = profile.pop('pronunciation_scores', [])
+    if 'pronunciation_log' in saved_state:
+        st.session_state.pronunciation_log = PronunciationLog.from_dict(saved_state['pronunciation_log'])
+    else:
+        st.session_state.pronunciation_log = migrate_pronunciation_history(
+            legacy_scores, saved_state.get('pronunciation_feedback', []))
+    legacy_points = profile.pop('total_points', 0)
+    if 'points_ledger' in saved_state:
+        st.session_state.points = PointsLedger.from_dict(saved_state['points_ledger'])
+    else:
+        st.session_state.points = migrate_points_ledger(legacy_points, profile)
+    st.session_state.user_profile = profile
+    st.session_state.conversation_history = saved_state.get('conversation_history', [])
+    st.session_state.activity = ActivityRollups(saved_state.get('activity_rollups', {}))
+    profile.pop('streak', None)
+    if 'streaks' in saved_state:
+        st.session_state.streaks = StreakTracker.from_dict(saved_state['streaks'])
+    else:
+        st.session_state.streaks = StreakTracker.from_rollups(st.session_state.activity, current_time().date())
+    st.session_state.saved_review_schedules = {
+        key[len(REVIEW_SCHEDULE_KEY_PREFIX):]: value for key, value in saved_state.items()
+        if key.startswith(REVIEW_SCHEDULE_KEY_PREFIX)
+    }
+    st.session_state.review_schedulers = {}
+    # Store key -> version of the component last staged under it
+    st.session_state.staged_versions = {}
+    st.session_state.achievements = AchievementTracker(get_achievement_rules(), saved_state.get('achievements'))
+    # Catch up on anything earned before it was tracked; afterwards only changes are checked
+    for metric, value in achievement_metrics().items():
+        st.session_state.achievements.update(metric, value, time.time())
 
 if 'current_lesson' not in st.session_state:
     st.session_state.current_lesson = None
 
-if 'pronunciation_feedback' not in st.session_state:
-    st.session_state.pronunciation_feedback = []
-
-# Language data and lessons
-LANGUAGES = {
-    'Spanish': {
-        'greetings': ['Hola', 'Buenos días', 'Buenas tardes', 'Buenas noches'],
-        'basics': ['Por favor', 'Gracias', 'De nada', 'Perdón', 'Lo siento'],
-        'questions': ['¿Cómo estás?', '¿Cómo te llamas?', '¿Dónde vives?', '¿Qué haces?'],
-        'family': ['madre', 'padre', 'hermano', 'hermana', 'hijo', 'hija'],
-        'numbers': ['uno', 'dos', 'tres', 'cuatro', 'cinco', 'seis', 'siete', 'ocho', 'nueve', 'diez'],
-        'colors': ['rojo', 'azul', 'verde', 'amarillo', 'negro', 'blanco', 'rosa', 'naranja'],
-        'food': ['comida', 'agua', 'pan', 'leche', 'carne', 'pollo', 'pescado', 'verduras'],
-        'cultural_tips': [
-            "In Spanish-speaking countries, it's common to greet with a kiss on the cheek or a hug, even in business settings.",
-            "The siesta tradition is still observed in many Spanish-speaking countries, with businesses closing from 2-4 PM.",
-            "Family gatherings are extremely important in Hispanic culture, often lasting several hours with multiple generations present.",
-            "Punctuality varies by country - in some places, arriving 15-30 minutes late is considered normal for social events."
-        ]
-    },
-    'French': {
-        'greetings': ['Bonjour', 'Bonsoir', 'Salut', 'Bonne nuit'],
-        'basics': ['S\'il vous plaît', 'Merci', 'De rien', 'Pardon', 'Excusez-moi'],
-        'questions': ['Comment allez-vous?', 'Comment vous appelez-vous?', 'Où habitez-vous?'],
-        'family': ['mère', 'père', 'frère', 'sœur', 'fils', 'fille'],
-        'numbers': ['un', 'deux', 'trois', 'quatre', 'cinq', 'six', 'sept', 'huit', 'neuf', 'dix'],
-        'colors': ['rouge', 'bleu', 'vert', 'jaune', 'noir', 'blanc', 'rose', 'orange'],
-        'food': ['nourriture', 'eau', 'pain', 'lait', 'viande', 'poulet', 'poisson', 'légumes'],
-        'cultural_tips': [
-            "French people value proper greetings - always say 'Bonjour' when entering shops or meeting someone.",
-            "Lunch is sacred in France, typically lasting 1-2 hours with multiple courses.",
-            "The French appreciate when foreigners attempt to speak French, even if imperfect.",
-            "Tipping is not mandatory in France as service is included, but rounding up is appreciated."
-        ]
-    },
-    'German': {
-        'greetings': ['Guten Tag', 'Guten Morgen', 'Guten Abend', 'Gute Nacht'],
-        'basics': ['Bitte', 'Danke', 'Bitte schön', 'Entschuldigung', 'Es tut mir leid'],
-        'questions': ['Wie geht es Ihnen?', 'Wie heißen Sie?', 'Wo wohnen Sie?'],
-        'family': ['Mutter', 'Vater', 'Bruder', 'Schwester', 'Sohn', 'Tochter'],
-        'numbers': ['eins', 'zwei', 'drei', 'vier', 'fünf', 'sechs', 'sieben', 'acht', 'neun', 'zehn'],
-        'colors': ['rot', 'blau', 'grün', 'gelb', 'schwarz', 'weiß', 'rosa', 'orange'],
-        'food': ['Essen', 'Wasser', 'Brot', 'Milch', 'Fleisch', 'Huhn', 'Fisch', 'Gemüse'],
-        'cultural_tips': [
-            "Germans value punctuality highly - being late is considered disrespectful.",
-            "Direct communication is preferred in German culture - beating around the bush is uncommon.",
-            "Sunday is a day of rest in Germany - most shops are closed and loud activities are avoided.",
-            "Germans often separate work and personal life strictly - don't be offended by formal interactions."
-        ]
-    }
-}
+if 'pending_pronunciation_jobs' not in st.session_state:
+    st.session_state.pending_pronunciation_jobs = []
+    # (kind, item) -> digest of the last recording submitted for scoring
+    st.session_state.scored_recordings = {}
 
-CONVERSATION_SCENARIOS = {
-    'Beginner': [
-        {'scenario': 'Meeting Someone New', 'context': 'You\'re at a coffee shop and want to introduce yourself to someone.'},
-        {'scenario': 'Ordering Food', 'context': 'You\'re at a restaurant and need to order your meal.'},
-        {'scenario': 'Asking for Directions', 'context': 'You\'re lost and need to ask someone for help getting to the train station.'},
-        {'scenario': 'Shopping', 'context': 'You\'re at a store and want to buy clothes.'}
-    ],
-    'Intermediate': [
-        {'scenario': 'Job Interview', 'context': 'You\'re interviewing for a position at a local company.'},
-        {'scenario': 'Making Plans', 'context': 'You\'re trying to coordinate weekend plans with friends.'},
-        {'scenario': 'Discussing Hobbies', 'context': 'You\'re at a social gathering talking about your interests.'},
-        {'scenario': 'Traveling', 'context': 'You\'re at the airport dealing with a flight delay.'}
-    ],
-    'Advanced': [
-        {'scenario': 'Business Meeting', 'context': 'You\'re presenting a proposal to international clients.'},
-        {'scenario': 'Cultural Discussion', 'context': 'You\'re debating cultural differences with native speakers.'},
-        {'scenario': 'Problem Solving', 'context': 'You\'re working with a team to solve a complex issue.'},
-        {'scenario': 'Academic Discussion', 'context': 'You\'re participating in a university seminar.'}
-    ]
-}
+def get_review_scheduler(language):
+    """This learner's review queue for a language, restored on first use"""
+    schedulers = st.session_state.review_schedulers
+    if language not in schedulers:
+        saved = st.session_state.saved_review_schedules.pop(language, None)
+        schedulers[language] = ReviewScheduler.from_dict(saved) if saved else ReviewScheduler()
+        st.session_state.staged_versions[REVIEW_SCHEDULE_KEY_PREFIX + language] = schedulers[language].version
+    return schedulers[language]
 
 def get_user_level_score():
     """Calculate user's current level based on their progress"""
@@ -196,8 +463,8 @@ def get_user_level_score():
     score = (
         profile['lessons_completed'] * 10 +
         profile['conversations_had'] * 15 +
-        len(profile['vocabulary_mastered']) * 5 +
-        profile['total_points']
+        st.session_state.mastered.count(profile['target_language']) * 5 +
+        st.session_state.points.total
     )
     return score
 
@@ -211,10 +478,12 @@ def get_adaptive_difficulty():
     else:
         return 'Advanced'
 
-def simulate_pronunciation_score():
+@metrics.instrument('scoring:simulated')
+def simulate_pronunciation_score(user_level=None):
     """Simulate pronunciation scoring (in real app, this would use speech recognition)"""
     base_score = random.randint(70, 100)
-    user_level = get_adaptive_difficulty()
+    if user_level is None:
+        user_level = get_adaptive_difficulty()
     
     if user_level == 'Beginner':
         return max(60, base_score - 10)
@@ -223,39 +492,141 @@ def simulate_pronunciation_score():
     else:
         return base_score
 
-def get_ai_response(user_input, scenario_context, language):
-    """Generate AI response based on user input and context"""
-    responses = {
-        'Spanish': {
-            'greeting': "¡Hola! Me llamo María. ¿Cómo te llamas?",
-            'food': "¡Excelente elección! ¿Te gustaría algo de beber también?",
-            'directions': "¡Por supuesto! La estación de tren está a dos cuadras hacia el norte.",
-            'general': "Interesante. ¿Puedes contarme más sobre eso?"
-        },
-        'French': {
-            'greeting': "Bonjour! Je m'appelle Marie. Comment vous appelez-vous?",
-            'food': "Excellent choix! Voulez-vous quelque chose à boire aussi?",
-            'directions': "Bien sûr! La gare est à deux pâtés de maisons vers le nord.",
-            'general': "C'est intéressant. Pouvez-vous m'en dire plus?"
-        },
-        'German': {
-            'greeting': "Hallo! Ich heiße Maria. Wie heißen Sie?",
-            'food': "Ausgezeichnete Wahl! Möchten Sie auch etwas trinken?",
-            'directions': "Natürlich! Der Bahnhof ist zwei Blocks nach Norden.",
-            'general': "Das ist interessant. Können Sie mir mehr darüber erzählen?"
-        }
-    }
-    
-    # Simple keyword matching for demo purposes
-    if any(word in user_input.lower() for word in ['hello', 'hi', 'hola', 'bonjour', 'hallo']):
-        return responses[language]['greeting']
-    elif any(word in user_input.lower() for word in ['food', 'eat', 'comida', 'manger', 'essen']):
-        return responses[language]['food']
-    elif any(word in user_input.lower() for word in ['direction', 'where', 'dónde', 'où', 'wo']):
-        return responses[language]['directions']
+# Feedback per practice kind: (min score, message type, message, points, balloons)
+PRONUNCIATION_GRADES = {
+    'word': [
+        (90, 'success', "🎉 Excellent! Score: {score}/100", 25, True),
+        (80, 'success', "👍 Very Good! Score: {score}/100", 20, False),
+        (70, 'info', "😊 Good! Score: {score}/100", 15, False),
+        (60, 'warning', "🤔 Keep practicing! Score: {score}/100", 10, False),
+        (0, 'error', "😅 Try again! Score: {score}/100", 5, False)
+    ],
+    'phrase': [
+        (85, 'success', "🎉 Excellent phrase pronunciation! Score: {score}/100", 30, False),
+        (0, 'info', "Good effort! Score: {score}/100", 15, False)
+    ],
+    'twister': [
+        (90, 'success', "🏆 AMAZING! Tongue twister master! Score: {score}/100", 50, True),
+        (80, 'success', "🎉 Great job! Score: {score}/100", 40, False),
+        (0, 'info', "Good attempt! Tongue twisters are tricky! Score: {score}/100", 25, False)
+    ]
+}
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide background executor for scoring jobs"""
+    return JobQueue()
+
+def recording_input(label, key):
+    """WAV bytes from the microphone widget or an uploaded file, or None"""
+    recording = st.audio_input(label, key=key)
+    if recording is None:
+        recording = st.file_uploader("...or upload a WAV recording", type=['wav'], key=f"{key}_upload")
+    return recording.getvalue() if recording is not None else None
+
+@metrics.instrument('scoring:recording')
+def score_pronunciation(language, text, audio, audio_cache):
+    """Job body: a 0-100 score, or a message explaining why the clip couldn't be scored"""
+    # Deferred: NumPy is only needed once a learner submits a recording
+    from utils.pronunciation import PronunciationError, score_recording
+    try:
+        return score_recording(language, text, audio, audio_cache)
+    except PronunciationError as exc:
+        return str(exc)
+    except Exception as exc:
+        # Anything else would be re-raised by pop_result on every poll of the job
+        return f"This recording couldn't be scored ({exc.__class__.__name__}). Please try recording it again."
+
+def submit_pronunciation_job(kind, item, audio):
+    """Queue a recording for scoring without blocking the rerun; each recording is scored once"""
+    digest = hashlib.blake2b(audio, digest_size=16).hexdigest()
+    if st.session_state.scored_recordings.get((kind, item)) == digest:
+        return
+    target_language = st.session_state.user_profile['target_language']
+    try:
+        job_id = get_job_queue().submit(score_pronunciation, target_language, item, audio, get_audio_cache())
+    except JobQueueFull as exc:
+        # Not recorded as scored, so the same clip is retried on the next rerun
+        st.warning(str(exc))
+        return
+    st.session_state.scored_recordings[(kind, item)] = digest
+    st.session_state.pending_pronunciation_jobs.append({'job_id': job_id, 'kind': kind, 'item': item})
+
+def apply_pronunciation_result(kind, item, score):
+    """Record a finished score, award points and remember the feedback to show"""
+    st.session_state.pronunciation_log.record(kind, item, score, time.time())
+    update_achievements(achievements.BEST_PRONUNCIATION_SCORE, st.session_state.pronunciation_log.max_score)
+    record_activity(activity.PRONUNCIATION_ATTEMPT)
+    for min_score, message_type, message, grade_points, balloons in PRONUNCIATION_GRADES[kind]:
+        if score >= min_score:
+            award_points(points.PRONUNCIATION_PRACTICE, grade_points)
+            st.session_state.pronunciation_result = (message_type, message.format(score=score), balloons)
+            break
+
+@st.fragment(run_every=0.5)
+def poll_pronunciation_jobs():
+    """Collect finished scoring jobs; reruns the page once all are done"""
+    queue = get_job_queue()
+    pending = st.session_state.pending_pronunciation_jobs
+    finished = [job for job in pending if queue.done(job['job_id'])]
+    for job in finished:
+        pending.remove(job)
+        try:
+            score = queue.pop_result(job['job_id'])
+        except KeyError:
+            continue
+        if isinstance(score, str):
+            st.session_state.pronunciation_result = ('warning', score, False)
+            continue
+        apply_pronunciation_result(job['kind'], job['item'], score)
+    if pending:
+        st.caption("Analyzing pronunciation...")
+    else:
+        st.rerun()
+
+def show_pronunciation_result():
+    """Show the latest scoring result once, then clear it"""
+    result = st.session_state.pop('pronunciation_result', None)
+    if result:
+        message_type, message, balloons = result
+        getattr(st, message_type)(message)
+        if balloons:
+            st.balloons()
+
+@st.cache_resource
+def get_audio_cache():
+    """Process-wide pronunciation audio cache (synthesizer chosen by LANGAPP_TTS)"""
+    return create_audio_cache()
+
+@st.fragment(run_every=0.5)
+def wait_for_reference_audio():
+    """Rerun the page once a background render finishes"""
+    if st.session_state.listen_request['render'].done():
+        st.rerun()
+    st.caption("🎵 Preparing audio...")
+
+def show_reference_audio(language, text):
+    """Play the requested clip from the audio cache, rendering it first if needed"""
+    request = st.session_state.get('listen_request')
+    if not request or request['item'] != (language, text):
+        return
+    clip = get_audio_cache().get(language, text)
+    if clip is not None:
+        # Served as stored: no decoding or re-encoding of the cached WAV
+        st.audio(clip[:], format="audio/wav")
+    elif not request['render'].done():
+        wait_for_reference_audio()
     else:
-        return responses[language]['general']
+        error = request['render'].exception()
+        st.warning(str(error) if error else "Audio isn't available for this word yet.")
+        del st.session_state.listen_request
+
+@st.cache_resource
+def get_conversation_engine():
+    """Process-wide conversation engine (backend chosen by LANGAPP_CHAT_BACKEND)"""
+    return create_engine()
 
+@metrics.instrument('page:dashboard')
 def create_dashboard():
     """Create the main dashboard"""
     st.markdown('<div class="main-header"><h1>🌍 AI Language Learning Companion</h1><p>Your personalized journey to fluency</p></div>', unsafe_allow_html=True)
@@ -264,10 +635,10 @@ def create_dashboard():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("🏆 Total Points", st.session_state.user_profile['total_points'])
+        st.metric("🏆 Total Points", st.session_state.points.total)
     
     with col2:
-        st.metric("🔥 Current Streak", f"{st.session_state.user_profile['streak']} days")
+        st.metric("🔥 Current Streak", f"{st.session_state.streaks.streak(current_time().date())} days")
     
     with col3:
         st.metric("📚 Lessons Completed", st.session_state.user_profile['lessons_completed'])
@@ -283,64 +654,45 @@ def create_dashboard():
     
     with col1:
         # Skill level radar chart
-        skills = ['Vocabulary', 'Grammar', 'Pronunciation', 'Conversation', 'Listening', 'Reading']
-        scores = [
-            min(len(st.session_state.user_profile['vocabulary_mastered']), 10),
-            random.randint(5, 10),  # Mock grammar score
-            8 if st.session_state.user_profile['pronunciation_scores'] else 5,
+        skills = ('Vocabulary', 'Grammar', 'Pronunciation', 'Conversation', 'Listening', 'Reading')
+        rollups = st.session_state.activity
+        today = current_time().date()
+        scores = (
+            min(st.session_state.mastered.count(st.session_state.user_profile['target_language']), 10),
+            min(rollups.window_total(activity.QUIZ_CORRECT, 30, today), 10),
+            8 if st.session_state.pronunciation_log.count else 5,
             min(st.session_state.user_profile['conversations_had'], 10),
-            random.randint(5, 10),  # Mock listening score
-            random.randint(5, 10)   # Mock reading score
-        ]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=scores,
-            theta=skills,
-            fill='toself',
-            name='Your Skills',
-            marker=dict(color='rgb(102, 126, 234)')
-        ))
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 10]
-                )),
-            showlegend=False,
-            title="Skill Assessment"
+            min(rollups.window_total(activity.LISTEN, 30, today), 10),
+            min(rollups.window_total(activity.CULTURAL_ANSWER, 30, today), 10)
         )
-        st.plotly_chart(fig, use_container_width=True)
+        
+        with metrics.timed('figure:skill_radar'):
+            st.plotly_chart(skill_radar_figure(skills, scores), use_container_width=True)
     
     with col2:
-        # Weekly progress
-        dates = [datetime.now() - timedelta(days=i) for i in range(7, 0, -1)]
-        daily_points = [random.randint(10, 50) for _ in range(7)]
+        # Weekly progress from the daily rollups
+        today = current_time().date()
+        dates = tuple(day_labels(7, today))
+        daily_points = tuple(st.session_state.activity.series(activity.POINTS, 7, today))
         
-        fig = px.line(
-            x=dates,
-            y=daily_points,
-            title="Weekly Learning Activity",
-            labels={'x': 'Date', 'y': 'Points Earned'}
-        )
-        fig.update_traces(line_color='rgb(102, 126, 234)')
-        st.plotly_chart(fig, use_container_width=True)
+        with metrics.timed('figure:weekly_points'):
+            st.plotly_chart(weekly_points_figure(dates, daily_points), use_container_width=True)
     
-    # Achievements
+    # Achievements, newest first
     st.subheader("🏅 Recent Achievements")
-    achievements = [
-        "First Conversation Complete",
-        "10 Words Mastered",
-        "Perfect Pronunciation",
-        "3-Day Streak"
-    ]
-    
-    achievement_html = ""
-    for achievement in achievements:
-        achievement_html += f'<span class="achievement-badge">{achievement}</span>'
-    
-    st.markdown(achievement_html, unsafe_allow_html=True)
+    recent_achievements = st.session_state.achievements.recent(RECENT_ACHIEVEMENT_LIMIT)
+    if recent_achievements:
+        badges = cards.ACHIEVEMENT_BADGE.render_many({'name': achievement.name} for achievement in recent_achievements)
+        st.markdown(badges, unsafe_allow_html=True)
+    else:
+        st.info("Complete lessons, conversations and practice to unlock achievements!")
 
+@st.cache_resource
+def list_timezones():
+    """IANA timezone names (listing them scans the tz database, so do it once)"""
+    return sorted(zoneinfo.available_timezones())
+
+@metrics.instrument('page:profile_setup')
 def create_profile_setup():
     """Create user profile setup"""
     st.header("👤 User Profile Setup")
@@ -367,6 +719,13 @@ def create_profile_setup():
             index=['Beginner', 'Intermediate', 'Advanced'].index(st.session_state.user_profile.get('level', 'Beginner'))
         )
         daily_goal = st.slider("Daily Learning Goal (minutes)", 10, 120, st.session_state.user_profile.get('daily_goal', 20))
+        timezones = ['Server default'] + list_timezones()
+        current_timezone = st.session_state.user_profile.get('timezone')
+        timezone = st.selectbox(
+            "Timezone (when your day starts and ends)",
+            timezones,
+            index=timezones.index(current_timezone) if current_timezone in timezones else 0
+        )
         interests = st.multiselect(
             "Learning Interests",
             ['Travel', 'Business', 'Culture', 'Food', 'Sports', 'Technology', 'Arts', 'Music'],
@@ -380,11 +739,20 @@ def create_profile_setup():
             'target_language': target_language,
             'level': level,
             'daily_goal': daily_goal,
-            'interests': interests
+            'interests': interests,
+            'timezone': None if timezone == 'Server default' else timezone
         })
         st.success("Profile updated successfully!")
         st.rerun()
 
+def compact_conversation_history():
+    """Drop the oldest messages once the stored history exceeds its cap"""
+    history = st.session_state.conversation_history
+    overflow = len(history) - MAX_CHAT_HISTORY
+    if overflow > 0:
+        del history[:overflow]
+
+@metrics.instrument('page:conversation_practice')
 def create_conversation_practice():
     """Create conversation practice interface"""
     st.header("💬 AI Conversation Partner")
@@ -395,7 +763,12 @@ def create_conversation_practice():
     
     st.subheader(f"Current Level: {user_level}")
     
-    scenarios = CONVERSATION_SCENARIOS.get(user_level, CONVERSATION_SCENARIOS['Beginner'])
+    if not has_language_pack(target_language):
+        st.warning(f"Conversation practice for {target_language} is coming soon!")
+        return
+    
+    all_scenarios = load_conversation_scenarios()
+    scenarios = all_scenarios.get(user_level, all_scenarios['Beginner'])
     
     col1, col2 = st.columns([1, 2])
     
@@ -411,209 +784,294 @@ def create_conversation_practice():
         st.info(f"**Context:** {scenario_context}")
         
         # Cultural tip
-        if target_language in LANGUAGES:
-            cultural_tip = random.choice(LANGUAGES[target_language]['cultural_tips'])
-            st.markdown(f'<div class="cultural-tip"><strong>💡 Cultural Tip:</strong><br>{cultural_tip}</div>', unsafe_allow_html=True)
+        cultural_tips = load_language_pack(target_language)['cultural_tips']
+        if cultural_tips:
+            cultural_tip = random.choice(cultural_tips)
+            st.markdown(cards.SCENARIO_TIP.render(tip=cultural_tip), unsafe_allow_html=True)
     
     with col2:
         st.subheader("Conversation")
-        
-        # Display conversation history
-        chat_container = st.container()
-        
-        with chat_container:
-            for i, message in enumerate(st.session_state.conversation_history):
-                if message['role'] == 'user':
-                    st.markdown(f'<div class="chat-message user-message"><strong>You:</strong> {message["content"]}</div>', unsafe_allow_html=True)
+        show_chat(target_language, selected_scenario, scenario_context)
+
+@interactive_fragment
+def show_chat(target_language, scenario, scenario_context):
+    """Chat history, input and actions; sending a message reruns only this region"""
+    # Display conversation history
+    chat_container = st.container()
+
+    with chat_container:
+        history = st.session_state.conversation_history
+        visible_count = st.session_state.get('chat_visible_count', CHAT_WINDOW_SIZE)
+        hidden_count = max(0, len(history) - visible_count)
+        if hidden_count:
+            st.button(f"⬆️ Load earlier messages ({hidden_count} hidden)",
+                      on_click=show_more_chat, args=(visible_count,))
+
+        # Only the most recent window is rendered, so cost stays flat as the chat grows;
+        # it goes out as one markdown element rather than one per message
+        with metrics.timed('chat:history'):
+            if hidden_count < len(history):
+                st.markdown(cards.chat_bubbles_html(history[hidden_count:]), unsafe_allow_html=True)
+
+        # A message sent by the Send callback is already in the history above;
+        # stream the AI response under it as it is generated
+        user_message = st.session_state.pop('pending_chat_message', None)
+        if user_message:
+            st.markdown("**AI Partner:**")
+            ai_response = st.write_stream(
+                get_conversation_engine().stream_reply(target_language, scenario, scenario_context, user_message)
+            )
+            st.session_state.conversation_history.append({
+                'role': 'assistant',
+                'content': ai_response
+            })
+
+            compact_conversation_history()
+
+            # Update user stats
+            st.session_state.user_profile['conversations_had'] += 1
+            update_achievements(achievements.CONVERSATIONS_HAD, st.session_state.user_profile['conversations_had'])
+            record_activity(activity.MESSAGE_SENT)
+            award_points(points.CONVERSATION_MESSAGE)
+
+    # User input
+    user_input = st.text_input("Type your message:", key="conversation_input")
+
+    col_send, col_pronounce, col_clear = st.columns([1, 1, 1])
+
+    with col_send:
+        st.button("Send Message", type="primary", on_click=send_chat_message)
+
+    with col_pronounce:
+        if st.button("🎤 Practice Pronunciation"):
+            if user_input:
+                # Simulate pronunciation analysis. The score is only an estimate, so it
+                # stays out of the pronunciation log that analytics and achievements read
+                score = simulate_pronunciation_score()
+                record_activity(activity.PRONUNCIATION_ATTEMPT)
+
+                if score >= 85:
+                    st.success(f"Excellent pronunciation! Score: {score}/100")
+                    award_points(points.CONVERSATION_PRONUNCIATION, 15)
+                elif score >= 70:
+                    st.info(f"Good pronunciation! Score: {score}/100")
+                    award_points(points.CONVERSATION_PRONUNCIATION, 10)
                 else:
-                    st.markdown(f'<div class="chat-message ai-message"><strong>AI Partner:</strong> {message["content"]}</div>', unsafe_allow_html=True)
-        
-        # User input
-        user_input = st.text_input("Type your message:", key="conversation_input")
-        
-        col_send, col_pronounce, col_clear = st.columns([1, 1, 1])
-        
-        with col_send:
-            if st.button("Send Message", type="primary"):
-                if user_input:
-                    # Add user message
-                    st.session_state.conversation_history.append({
-                        'role': 'user',
-                        'content': user_input
-                    })
-                    
-                    # Generate AI response
-                    ai_response = get_ai_response(user_input, scenario_context, target_language)
-                    st.session_state.conversation_history.append({
-                        'role': 'assistant',
-                        'content': ai_response
-                    })
-                    
-                    # Update user stats
-                    st.session_state.user_profile['conversations_had'] += 1
-                    st.session_state.user_profile['total_points'] += 10
-                    
-                    st.rerun()
-        
-        with col_pronounce:
-            if st.button("🎤 Practice Pronunciation"):
-                if user_input:
-                    # Simulate pronunciation analysis
-                    score = simulate_pronunciation_score()
-                    st.session_state.user_profile['pronunciation_scores'].append(score)
-                    
-                    if score >= 85:
-                        st.success(f"Excellent pronunciation! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 15
-                    elif score >= 70:
-                        st.info(f"Good pronunciation! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 10
-                    else:
-                        st.warning(f"Keep practicing! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 5
-        
-        with col_clear:
-            if st.button("Clear Chat"):
-                st.session_state.conversation_history = []
-                st.rerun()
+                    st.warning(f"Keep practicing! Score: {score}/100")
+                    award_points(points.CONVERSATION_PRONUNCIATION, 5)
+
+    with col_clear:
+        st.button("Clear Chat", on_click=clear_chat)
+
+def show_more_chat(visible_count):
+    st.session_state.chat_visible_count = visible_count + CHAT_WINDOW_SIZE
+
+def send_chat_message():
+    """Add the typed message to the chat; show_chat streams the reply to it"""
+    user_input = st.session_state.conversation_input
+    if user_input:
+        st.session_state.conversation_history.append({
+            'role': 'user',
+            'content': user_input
+        })
+        st.session_state.pending_chat_message = user_input
+
+def clear_chat():
+    st.session_state.conversation_history = []
+    st.session_state.chat_visible_count = CHAT_WINDOW_SIZE
+
+@interactive_fragment
+def show_flashcards(target_language, category):
+    """Flashcard and review queue; flipping cards or grading reviews reruns only this region"""
+    vocabulary = get_vocabulary_index(target_language)
+    words = vocabulary.category_words[category]
+
+    # Create flashcard-style learning; each language's packs have their own positions
+    index_key = f"current_{target_language}_{category}_index"
+    # Clamped in case the pack has fewer words than when the position was saved
+    current_index = st.session_state.get(index_key, 0) % len(words)
+    current_word = words[current_index]
+
+    # Display current word
+    st.markdown(cards.FLASHCARD.render(word=current_word, position=current_index + 1, total=len(words)),
+                unsafe_allow_html=True)
+
+    # Navigation buttons
+    col_prev, col_next, col_master = st.columns(3)
+
+    with col_prev:
+        st.button("⬅️ Previous", disabled=current_index == 0,
+                  on_click=show_flashcard, args=(index_key, current_index - 1))
+
+    with col_next:
+        st.button("➡️ Next", disabled=current_index == len(words) - 1,
+                  on_click=show_flashcard, args=(index_key, current_index + 1))
+
+    with col_master:
+        st.button("✅ Mark as Mastered", on_click=master_flashcard,
+                  args=(target_language, vocabulary.word_id(category, current_index), current_word))
+
+    feedback = st.session_state.pop('flashcard_feedback', None)
+    if feedback:
+        getattr(st, feedback[0])(feedback[1])
+
+    # Spaced repetition: every word seen on a flashcard joins the review queue
+    scheduler = get_review_scheduler(target_language)
+    now = time.time()
+    scheduler.add(vocabulary.word_id(category, current_index), now)
+
+    st.subheader("🔁 Spaced Repetition Review")
+    due_word_id = scheduler.next_due(now)
+    if due_word_id is None:
+        next_due = scheduler.next_due_time()
+        when = datetime.fromtimestamp(next_due).strftime('%b %d, %H:%M') if next_due else "—"
+        st.info(f"No reviews due ({len(scheduler)} in your queue). Next review: {when}")
+    else:
+        st.write(f"How well do you remember **{vocabulary.word(due_word_id)}**?")
+        grade_columns = st.columns(len(REVIEW_GRADES))
+        for grade_column, (label, quality) in zip(grade_columns, REVIEW_GRADES):
+            with grade_column:
+                st.button(label, key=f"review_grade_{quality}", on_click=scheduler.review,
+                          args=(due_word_id, quality, now))
+
+def show_flashcard(index_key, index):
+    st.session_state[index_key] = index
+
+def master_flashcard(language, word_id, word):
+    if st.session_state.mastered.add(language, word_id):
+        update_achievements(achievements.WORDS_MASTERED, st.session_state.mastered.total())
+        award_points(points.WORD_MASTERED)
+        st.session_state.flashcard_feedback = ('success', f"Great! You've mastered '{word}'")
+        # Mastery changes the progress section and sidebar too
+        refresh_page()
+    else:
+        st.session_state.flashcard_feedback = ('info', "Already mastered!")
+
+@interactive_fragment
+def show_vocabulary_quiz(target_language, category):
+    """Vocabulary quiz; answering reruns only this region until the last question"""
+    # The whole batch of questions is generated up front from a stored seed
+    if st.button("Start Quiz", type="primary"):
+        seed = random.randrange(2 ** 32)
+        st.session_state.current_quiz = {
+            'seed': seed,
+            'questions': get_quiz_generator(target_language).generate(category, QUIZ_LENGTH, seed),
+            'current_question': 0,
+            'score': 0,
+            'answers': []
+        }
+
+    if 'current_quiz' in st.session_state and st.session_state.current_quiz:
+        quiz = st.session_state.current_quiz
+        questions = quiz['questions']
 
+        feedback = quiz.pop('feedback', None)
+        if feedback:
+            getattr(st, feedback[0])(feedback[1])
+
+        if quiz['current_question'] < len(questions):
+            question = questions[quiz['current_question']]
+            st.write(f"**Question {quiz['current_question'] + 1}/{len(questions)}**")
+            st.write(f"What does '{question['word']}' mean in English?")
+
+            answer_key = f"quiz_{quiz['seed']}_{quiz['current_question']}"
+            st.radio("Choose your answer:", question['options'], key=answer_key)
+            st.button("Submit Answer", on_click=submit_quiz_answer, args=(answer_key,))
+        else:
+            # Quiz completed
+            st.success(f"Quiz completed! Your score: {quiz['score']}/{len(questions)}")
+            # Count the lesson once, not on every rerun of the results screen
+            if not quiz.get('completed'):
+                quiz['completed'] = True
+                st.session_state.user_profile['lessons_completed'] += 1
+                update_achievements(achievements.LESSONS_COMPLETED, st.session_state.user_profile['lessons_completed'])
+                record_activity(activity.LESSON_COMPLETED)
+            st.button("Start New Quiz", on_click=end_quiz)
+
+def end_quiz():
+    del st.session_state.current_quiz
+
+def submit_quiz_answer(answer_key):
+    quiz = st.session_state.current_quiz
+    questions = quiz['questions']
+    question = questions[quiz['current_question']]
+    answer = st.session_state[answer_key]
+    correct_answer = question['options'][question['answer']]
+    is_correct = answer == correct_answer
+    quiz['answers'].append(answer)
+    if is_correct:
+        quiz['score'] += 1
+        record_activity(activity.QUIZ_CORRECT)
+        quiz['feedback'] = ('success', "Correct!")
+    else:
+        quiz['feedback'] = ('error', f"Not quite: '{question['word']}' means '{correct_answer}'.")
+
+    quiz['current_question'] += 1
+    if is_correct:
+        award_points(points.VOCABULARY_QUIZ)
+    else:
+        award_points(points.VOCABULARY_QUIZ, points.VOCABULARY_QUIZ_MISS_POINTS)
+    # The final answer refreshes the whole page so totals elsewhere catch up
+    if quiz['current_question'] == len(questions):
+        refresh_page()
+
+@metrics.instrument('page:vocabulary_lessons')
 def create_vocabulary_lessons():
     """Create vocabulary learning interface"""
     st.header("📚 Vocabulary Lessons")
     
     target_language = st.session_state.user_profile['target_language']
     
-    if target_language not in LANGUAGES:
+    if not has_language_pack(target_language):
         st.warning(f"Vocabulary lessons for {target_language} are coming soon!")
         return
     
-    language_data = LANGUAGES[target_language]
+    vocabulary = get_vocabulary_index(target_language)
     
     # Lesson categories
-    categories = list(language_data.keys())
-    if 'cultural_tips' in categories:
-        categories.remove('cultural_tips')
-    
-    selected_category = st.selectbox("Choose a lesson category:", categories)
+    selected_category = st.selectbox("Choose a lesson category:", vocabulary.categories)
     
     col1, col2 = st.columns([1, 1])
     
     with col1:
         st.subheader(f"📖 {selected_category.title()} Vocabulary")
-        
-        words = language_data[selected_category]
-        
-        # Create flashcard-style learning
-        if f"current_{selected_category}_index" not in st.session_state:
-            st.session_state[f"current_{selected_category}_index"] = 0
-        
-        current_index = st.session_state[f"current_{selected_category}_index"]
-        current_word = words[current_index]
-        
-        # Display current word
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    color: white; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
-            <h2 style="margin: 0; font-size: 3rem;">{current_word}</h2>
-            <p style="margin: 0.5rem 0 0 0; opacity: 0.8;">Word {current_index + 1} of {len(words)}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Navigation buttons
-        col_prev, col_next, col_master = st.columns(3)
-        
-        with col_prev:
-            if st.button("⬅️ Previous", disabled=current_index == 0):
-                st.session_state[f"current_{selected_category}_index"] = max(0, current_index - 1)
-                st.rerun()
-        
-        with col_next:
-            if st.button("➡️ Next", disabled=current_index == len(words) - 1):
-                st.session_state[f"current_{selected_category}_index"] = min(len(words) - 1, current_index + 1)
-                st.rerun()
-        
-        with col_master:
-            if st.button("✅ Mark as Mastered"):
-                if current_word not in st.session_state.user_profile['vocabulary_mastered']:
-                    st.session_state.user_profile['vocabulary_mastered'].append(current_word)
-                    st.session_state.user_profile['total_points'] += 20
-                    st.success(f"Great! You've mastered '{current_word}'")
-                else:
-                    st.info("Already mastered!")
+        show_flashcards(target_language, selected_category)
     
     with col2:
         st.subheader("🎯 Practice Quiz")
-        
-        # Simple quiz functionality
-        if st.button("Start Quiz", type="primary"):
-            quiz_words = random.sample(words, min(5, len(words)))
-            st.session_state.current_quiz = {
-                'words': quiz_words,
-                'current_question': 0,
-                'score': 0,
-                'answers': []
-            }
-        
-        if 'current_quiz' in st.session_state and st.session_state.current_quiz:
-            quiz = st.session_state.current_quiz
-            
-            if quiz['current_question'] < len(quiz['words']):
-                current_word = quiz['words'][quiz['current_question']]
-                st.write(f"**Question {quiz['current_question'] + 1}/{len(quiz['words'])}**")
-                st.write(f"What does '{current_word}' mean in English?")
-                
-                # Generate multiple choice options (simplified)
-                options = ["Option A", "Option B", "Option C", "Correct Answer"]
-                random.shuffle(options)
-                
-                answer = st.radio("Choose your answer:", options, key=f"quiz_{quiz['current_question']}")
-                
-                if st.button("Submit Answer"):
-                    is_correct = answer == "Correct Answer"
-                    if is_correct:
-                        quiz['score'] += 1
-                        st.success("Correct!")
-                    else:
-                        st.error("Try again next time!")
-                    
-                    quiz['current_question'] += 1
-                    st.session_state.user_profile['total_points'] += 5 if is_correct else 2
-                    st.rerun()
-            else:
-                # Quiz completed
-                st.success(f"Quiz completed! Your score: {quiz['score']}/{len(quiz['words'])}")
-                st.session_state.user_profile['lessons_completed'] += 1
-                if st.button("Start New Quiz"):
-                    del st.session_state.current_quiz
-                    st.rerun()
+        show_vocabulary_quiz(target_language, selected_category)
         
         # Vocabulary progress
         st.subheader("📊 Your Vocabulary Progress")
-        mastered_count = len(st.session_state.user_profile['vocabulary_mastered'])
-        total_words = sum(len(words) for words in language_data.values() if isinstance(words, list))
+        mastered = st.session_state.mastered
+        mastered_count = mastered.count(target_language)
+        total_words = vocabulary.total_words
         
-        progress = mastered_count / total_words if total_words > 0 else 0
+        progress = min(mastered_count / total_words, 1.0) if total_words > 0 else 0
         st.progress(progress)
         st.write(f"Words mastered: {mastered_count}/{total_words}")
         
         # Recent mastered words
-        if st.session_state.user_profile['vocabulary_mastered']:
+        recent_word_ids = mastered.recent(target_language)
+        if recent_word_ids:
             st.subheader("🏆 Recently Mastered")
-            recent_words = st.session_state.user_profile['vocabulary_mastered'][-5:]
-            for word in recent_words:
-                st.write(f"✅ {word}")
+            for word_id in recent_word_ids:
+                word = vocabulary.word(word_id)
+                if word is not None:
+                    st.write(f"✅ {word}")
 
+@metrics.instrument('page:pronunciation_practice')
 def create_pronunciation_practice():
     """Create pronunciation practice interface"""
     st.header("🎤 Pronunciation Practice")
     
     target_language = st.session_state.user_profile['target_language']
     
-    if target_language not in LANGUAGES:
+    if not has_language_pack(target_language):
         st.warning(f"Pronunciation practice for {target_language} is coming soon!")
         return
     
-    language_data = LANGUAGES[target_language]
+    vocabulary = get_vocabulary_index(target_language)
     
     col1, col2 = st.columns([1, 1])
     
@@ -627,58 +1085,35 @@ def create_pronunciation_practice():
         )
         
         if practice_type == "Individual Words":
-            # Get random words from vocabulary
-            all_words = []
-            for category, words in language_data.items():
-                if isinstance(words, list):
-                    all_words.extend(words)
+            all_words = vocabulary.words
             
             if all_words:
                 practice_word = st.selectbox("Select a word to practice:", all_words)
                 
-                st.markdown(f"""
-                <div style="background: #f0f2f6; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
-                    <h3 style="margin: 0; color: #333;">Practice Word:</h3>
-                    <h1 style="margin: 0.5rem 0; color: #667eea; font-size: 3rem;">{practice_word}</h1>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(cards.PRACTICE_WORD.render(word=practice_word), unsafe_allow_html=True)
+                
+                best_score = st.session_state.pronunciation_log.best.get(practice_word)
+                if best_score is not None:
+                    st.caption(f"Your best for this word: {best_score}/100")
                 
                 col_record, col_listen = st.columns(2)
                 
                 with col_record:
-                    if st.button("🎤 Record Pronunciation", type="primary"):
-                        # Simulate recording and analysis
-                        with st.spinner("Analyzing pronunciation..."):
-                            time.sleep(2)
-                            score = simulate_pronunciation_score()
-                            st.session_state.pronunciation_feedback.append({
-                                'word': practice_word,
-                                'score': score,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                            
-                            if score >= 90:
-                                st.success(f"🎉 Excellent! Score: {score}/100")
-                                st.balloons()
-                                st.session_state.user_profile['total_points'] += 25
-                            elif score >= 80:
-                                st.success(f"👍 Very Good! Score: {score}/100")
-                                st.session_state.user_profile['total_points'] += 20
-                            elif score >= 70:
-                                st.info(f"😊 Good! Score: {score}/100")
-                                st.session_state.user_profile['total_points'] += 15
-                            elif score >= 60:
-                                st.warning(f"🤔 Keep practicing! Score: {score}/100")
-                                st.session_state.user_profile['total_points'] += 10
-                            else:
-                                st.error(f"😅 Try again! Score: {score}/100")
-                                st.session_state.user_profile['total_points'] += 5
+                    audio = recording_input("🎤 Record Pronunciation", key=f"recording_word_{practice_word}")
+                    if audio:
+                        submit_pronunciation_job('word', practice_word, audio)
                 
                 with col_listen:
                     if st.button("🔊 Listen to Pronunciation"):
-                        st.info("🎵 Playing pronunciation... (Audio would play here)")
-                    elif practice_type == "Common Phrases":
-                         phrases = [
+                        record_activity(activity.LISTEN)
+                        st.session_state.listen_request = {
+                            'item': (target_language, practice_word),
+                            'render': get_audio_cache().request(target_language, practice_word)
+                        }
+                    show_reference_audio(target_language, practice_word)
+        
+        elif practice_type == "Common Phrases":
+            phrases = [
                 "Hello, how are you?",
                 "Thank you very much",
                 "Where is the bathroom?",
@@ -691,100 +1126,41 @@ def create_pronunciation_practice():
             
             practice_phrase = st.selectbox("Select a phrase to practice:", phrases)
             
-            st.markdown(f"""
-            <div style="background: #f0f2f6; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
-                <h3 style="margin: 0; color: #333;">Practice Phrase:</h3>
-                <h2 style="margin: 0.5rem 0; color: #667eea;">{practice_phrase}</h2>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(cards.PRACTICE_PHRASE.render(phrase=practice_phrase), unsafe_allow_html=True)
             
-            if st.button("🎤 Record Phrase", type="primary"):
-                with st.spinner("Analyzing pronunciation..."):
-                    time.sleep(2)
-                    score = simulate_pronunciation_score()
-                    st.session_state.pronunciation_feedback.append({
-                        'phrase': practice_phrase,
-                        'score': score,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                    if score >= 85:
-                        st.success(f"🎉 Excellent phrase pronunciation! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 30
-                    else:
-                        st.info(f"Good effort! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 15
+            audio = recording_input("🎤 Record Phrase", key=f"recording_phrase_{practice_phrase}")
+            if audio:
+                submit_pronunciation_job('phrase', practice_phrase, audio)
         
         elif practice_type == "Tongue Twisters":
-            twisters = {
-                'Spanish': [
-                    "Tres tristes tigres tragaban trigo en un trigal",
-                    "El perro de San Roque no tiene rabo",
-                    "Pablito clavó un clavito"
-                ],
-                'French': [
-                    "Les chaussettes de l'archiduchesse",
-                    "Un chasseur sachant chasser",
-                    "Ces six saucissons-ci sont si secs"
-                ],
-                'German': [
-                    "Fischers Fritz fischt frische Fische",
-                    "Brautkleid bleibt Brautkleid",
-                    "Zehn zahme Ziegen"
-                ]
-            }
-            
-            language_twisters = twisters.get(target_language, twisters['Spanish'])
+            language_twisters = load_language_pack(target_language)['tongue_twisters']
             practice_twister = st.selectbox("Select a tongue twister:", language_twisters)
             
-            st.markdown(f"""
-            <div style="background: #fff3e0; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0; border: 2px solid #ffb74d;">
-                <h3 style="margin: 0; color: #333;">🌪️ Tongue Twister Challenge:</h3>
-                <h2 style="margin: 0.5rem 0; color: #ff9800;">{practice_twister}</h2>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(cards.TONGUE_TWISTER.render(twister=practice_twister), unsafe_allow_html=True)
             
-            if st.button("🎤 Challenge Accepted!", type="primary"):
-                with st.spinner("Analyzing your tongue twister..."):
-                    time.sleep(3)
-                    score = simulate_pronunciation_score()
-                    st.session_state.pronunciation_feedback.append({
-                        'twister': practice_twister,
-                        'score': score,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                    if score >= 90:
-                        st.success(f"🏆 AMAZING! Tongue twister master! Score: {score}/100")
-                        st.balloons()
-                        st.session_state.user_profile['total_points'] += 50
-                    elif score >= 80:
-                        st.success(f"🎉 Great job! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 40
-                    else:
-                        st.info(f"Good attempt! Tongue twisters are tricky! Score: {score}/100")
-                        st.session_state.user_profile['total_points'] += 25
+            audio = recording_input("🎤 Challenge Accepted!", key=f"recording_twister_{practice_twister}")
+            if audio:
+                submit_pronunciation_job('twister', practice_twister, audio)
+        
+        # Scoring runs in the background; poll for results on later reruns
+        if st.session_state.pending_pronunciation_jobs:
+            poll_pronunciation_jobs()
+        show_pronunciation_result()
     
     with col2:
         st.subheader("📊 Pronunciation Analytics")
         
         # Display recent pronunciation scores
-        if st.session_state.pronunciation_feedback:
-            recent_scores = [item['score'] for item in st.session_state.pronunciation_feedback[-10:]]
+        pronunciation_log = st.session_state.pronunciation_log
+        if pronunciation_log:
+            recent_scores = pronunciation_log.recent_scores()
             
             # Create line chart of progress
-            fig = px.line(
-                x=list(range(1, len(recent_scores) + 1)),
-                y=recent_scores,
-                title="Recent Pronunciation Scores",
-                labels={'x': 'Attempt', 'y': 'Score'}
-            )
-            fig.update_traces(line_color='rgb(102, 126, 234)')
-            fig.update_layout(yaxis_range=[0, 100])
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timed('figure:pronunciation_scores'):
+                st.plotly_chart(pronunciation_scores_figure(recent_scores), use_container_width=True)
             
             # Average score
-            avg_score = sum(recent_scores) / len(recent_scores)
+            avg_score = pronunciation_log.recent_mean()
             st.metric("Average Score", f"{avg_score:.1f}/100")
             
             # Pronunciation tips based on performance
@@ -811,122 +1187,91 @@ def create_pronunciation_practice():
         for tip in tips:
             st.write(f"• {tip}")
 
+@interactive_fragment
+def show_cultural_quiz(target_language):
+    """Cultural quiz; answering reruns only this region until the last question"""
+    questions = load_language_pack(target_language)['cultural_quiz']
+    if 'cultural_quiz_started' not in st.session_state:
+        st.session_state.cultural_quiz_started = False
+        st.session_state.cultural_quiz_score = 0
+        st.session_state.cultural_quiz_question = 0
+    
+    if not st.session_state.cultural_quiz_started:
+        st.button("Start Cultural Quiz", type="primary", on_click=start_cultural_quiz)
+    
+    else:
+        feedback = st.session_state.pop('cultural_quiz_feedback', None)
+        if feedback:
+            getattr(st, feedback[0])(feedback[1])
+        
+        if st.session_state.cultural_quiz_question < len(questions):
+            current_q = questions[st.session_state.cultural_quiz_question]
+            st.write(f"**Question {st.session_state.cultural_quiz_question + 1}/{len(questions)}**")
+            st.write(current_q['question'])
+            
+            answer_key = f"cultural_q_{st.session_state.cultural_quiz_question}"
+            st.radio("Choose your answer:", current_q['options'], key=answer_key)
+            st.button("Submit Answer", on_click=submit_cultural_answer, args=(questions, answer_key))
+        else:
+            st.success(f"Quiz completed! Your score: {st.session_state.cultural_quiz_score}/{len(questions)}")
+            if st.session_state.cultural_quiz_score == len(questions):
+                st.balloons()
+                st.write("🎉 Perfect score! You're a cultural expert!")
+            
+            st.button("Restart Quiz", on_click=restart_cultural_quiz)
+
+def start_cultural_quiz():
+    st.session_state.cultural_quiz_started = True
+    st.session_state.cultural_quiz_score = 0
+    st.session_state.cultural_quiz_question = 0
+
+def submit_cultural_answer(questions, answer_key):
+    # Feedback is shown on the next rerun instead of holding this one open
+    current_q = questions[st.session_state.cultural_quiz_question]
+    if current_q['options'].index(st.session_state[answer_key]) == current_q['correct']:
+        st.session_state.cultural_quiz_feedback = ('success', "Correct! " + current_q['explanation'])
+        st.session_state.cultural_quiz_score += 1
+        award_points(points.CULTURAL_QUIZ)
+    else:
+        st.session_state.cultural_quiz_feedback = ('error', "Not quite right. " + current_q['explanation'])
+        award_points(points.CULTURAL_QUIZ, points.CULTURAL_QUIZ_MISS_POINTS)
+
+    record_activity(activity.CULTURAL_ANSWER)
+    st.session_state.cultural_quiz_question += 1
+    # The final answer refreshes the whole page so totals elsewhere catch up
+    if st.session_state.cultural_quiz_question == len(questions):
+        refresh_page()
+
+def restart_cultural_quiz():
+    st.session_state.cultural_quiz_started = False
+
+@metrics.instrument('page:cultural_insights')
 def create_cultural_insights():
     """Create cultural insights and tips section"""
     st.header("🌍 Cultural Insights")
     
     target_language = st.session_state.user_profile['target_language']
     
-    if target_language not in LANGUAGES:
+    if not has_language_pack(target_language):
         st.warning(f"Cultural insights for {target_language} are coming soon!")
         return
     
-    cultural_tips = LANGUAGES[target_language]['cultural_tips']
+    pack = load_language_pack(target_language)
+    cultural_tips = pack['cultural_tips']
     
     st.subheader(f"🎭 {target_language} Cultural Tips")
     
-    # Display cultural tips in cards
-    for i, tip in enumerate(cultural_tips):
-        st.markdown(f"""
-        <div class="cultural-tip">
-            <h4>💡 Cultural Tip #{i+1}</h4>
-            <p>{tip}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # All tip cards in one markdown element, built once per language pack
+    if cultural_tips:
+        st.markdown(cards.cultural_tips_html(cultural_tips), unsafe_allow_html=True)
     
     # Interactive cultural quiz
     st.subheader("🧩 Cultural Knowledge Quiz")
     
-    quiz_questions = {
-        'Spanish': [
-            {
-                'question': "What time do people typically eat dinner in Spain?",
-                'options': ["6 PM", "8 PM", "10 PM", "12 AM"],
-                'correct': 2,
-                'explanation': "In Spain, dinner is typically eaten very late, often around 10 PM or later."
-            },
-            {
-                'question': "What is the appropriate greeting in most Spanish-speaking countries?",
-                'options': ["Handshake", "Bow", "Kiss on cheek", "Wave"],
-                'correct': 2,
-                'explanation': "A kiss on the cheek (or air kiss) is common, even in business settings."
-            }
-        ],
-        'French': [
-            {
-                'question': "What should you always do when entering a French shop?",
-                'options': ["Smile and wave", "Say 'Bonjour'", "Nod silently", "Ask for help immediately"],
-                'correct': 1,
-                'explanation': "Always greet with 'Bonjour' - it's considered rude not to greet in France."
-            },
-            {
-                'question': "How long is a typical French lunch break?",
-                'options': ["30 minutes", "1 hour", "1-2 hours", "3 hours"],
-                'correct': 2,
-                'explanation': "French lunch breaks are typically 1-2 hours, reflecting the importance of meals."
-            }
-        ],
-        'German': [
-            {
-                'question': "How important is punctuality in German culture?",
-                'options': ["Not important", "Somewhat important", "Very important", "Only for business"],
-                'correct': 2,
-                'explanation': "Punctuality is extremely important in German culture and being late is considered disrespectful."
-            },
-            {
-                'question': "What happens to most German shops on Sundays?",
-                'options': ["Open as usual", "Close early", "Most are closed", "Only food shops open"],
-                'correct': 2,
-                'explanation': "Most shops in Germany are closed on Sundays as it's considered a day of rest."
-            }
-        ]
-    }
-    
-    if target_language in quiz_questions:
-        questions = quiz_questions[target_language]
-        
-        if 'cultural_quiz_started' not in st.session_state:
-            st.session_state.cultural_quiz_started = False
-            st.session_state.cultural_quiz_score = 0
-            st.session_state.cultural_quiz_question = 0
-        
-        if not st.session_state.cultural_quiz_started:
-            if st.button("Start Cultural Quiz", type="primary"):
-                st.session_state.cultural_quiz_started = True
-                st.session_state.cultural_quiz_score = 0
-                st.session_state.cultural_quiz_question = 0
-                st.rerun()
-        
-        else:
-            if st.session_state.cultural_quiz_question < len(questions):
-                current_q = questions[st.session_state.cultural_quiz_question]
-                st.write(f"**Question {st.session_state.cultural_quiz_question + 1}/{len(questions)}**")
-                st.write(current_q['question'])
-                
-                answer = st.radio("Choose your answer:", current_q['options'], key=f"cultural_q_{st.session_state.cultural_quiz_question}")
-                
-                if st.button("Submit Answer"):
-                    if current_q['options'].index(answer) == current_q['correct']:
-                        st.success("Correct! " + current_q['explanation'])
-                        st.session_state.cultural_quiz_score += 1
-                        st.session_state.user_profile['total_points'] += 15
-                    else:
-                        st.error("Not quite right. " + current_q['explanation'])
-                        st.session_state.user_profile['total_points'] += 5
-                    
-                    st.session_state.cultural_quiz_question += 1
-                    time.sleep(2)
-                    st.rerun()
-            else:
-                st.success(f"Quiz completed! Your score: {st.session_state.cultural_quiz_score}/{len(questions)}")
-                if st.session_state.cultural_quiz_score == len(questions):
-                    st.balloons()
-                    st.write("🎉 Perfect score! You're a cultural expert!")
-                
-                if st.button("Restart Quiz"):
-                    st.session_state.cultural_quiz_started = False
-                    st.rerun()
+    if pack['cultural_quiz']:
+        show_cultural_quiz(target_language)
 
+@metrics.instrument('page:progress_analytics')
 def create_progress_analytics():
     """Create detailed progress analytics"""
     st.header("📈 Progress Analytics")
@@ -937,13 +1282,13 @@ def create_progress_analytics():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("🎯 Total Points", profile['total_points'])
+        st.metric("🎯 Total Points", st.session_state.points.total)
     with col2:
         st.metric("📚 Lessons Completed", profile['lessons_completed'])
     with col3:
         st.metric("💬 Conversations", profile['conversations_had'])
     with col4:
-        st.metric("🔤 Words Mastered", len(profile['vocabulary_mastered']))
+        st.metric("🔤 Words Mastered", st.session_state.mastered.count(profile['target_language']))
     
     # Detailed analytics
     col1, col2 = st.columns(2)
@@ -951,43 +1296,24 @@ def create_progress_analytics():
     with col1:
         st.subheader("📊 Learning Streak")
         
-        # Simulate learning activity over time
-        dates = [datetime.now() - timedelta(days=i) for i in range(30, 0, -1)]
-        activity = [random.choice([0, 1, 1, 1, 2, 2, 3]) for _ in range(30)]
+        # Minutes practiced per day from the daily rollups
+        today = current_time().date()
+        labels = tuple(d.strftime('%m-%d') for d in day_labels(30, today))
+        daily_minutes = tuple(round(seconds / 60) for seconds in st.session_state.activity.series(activity.TIME_SPENT, 30, today))
         
         # Create heatmap-style calendar
-        fig = px.imshow(
-            [activity],
-            x=[d.strftime('%m-%d') for d in dates],
-            color_continuous_scale='Blues',
-            title="Daily Learning Activity (Last 30 Days)"
-        )
-        fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="",
-            yaxis_showticklabels=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with metrics.timed('figure:activity_heatmap'):
+            st.plotly_chart(activity_heatmap_figure(labels, daily_minutes), use_container_width=True)
     
     with col2:
         st.subheader("🎯 Skill Breakdown")
         
-        # Create pie chart of points distribution
-        skills = ['Vocabulary', 'Pronunciation', 'Conversation', 'Cultural Knowledge']
-        points = [
-            len(profile['vocabulary_mastered']) * 20,
-            len(st.session_state.pronunciation_feedback) * 15,
-            profile['conversations_had'] * 10,
-            profile['lessons_completed'] * 25
-        ]
+        # Points per skill, kept up to date by the ledger
+        skill_points = st.session_state.points.skill_totals()
         
-        if sum(points) > 0:
-            fig = px.pie(
-                values=points,
-                names=skills,
-                title="Points Distribution by Skill"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        if sum(skill_points) > 0:
+            with metrics.timed('figure:skill_points_pie'):
+                st.plotly_chart(skill_points_pie_figure(points.SKILLS, skill_points), use_container_width=True)
         else:
             st.info("Start learning to see your skill breakdown!")
     
@@ -1005,23 +1331,43 @@ def create_progress_analytics():
     # Achievement system
     st.subheader("🏆 Achievement System")
     
-    achievements = [
-        {"name": "First Steps", "description": "Complete your first lesson", "unlocked": profile['lessons_completed'] >= 1},
-        {"name": "Chatterbox", "description": "Have 5 conversations", "unlocked": profile['conversations_had'] >= 5},
-        {"name": "Word Master", "description": "Master 20 vocabulary words", "unlocked": len(profile['vocabulary_mastered']) >= 20},
-        {"name": "Pronunciation Pro", "description": "Score 90+ on pronunciation", "unlocked": any(score >= 90 for score in profile['pronunciation_scores'])},
-        {"name": "Streak Keeper", "description": "Maintain a 7-day streak", "unlocked": profile['streak'] >= 7},
-        {"name": "Point Collector", "description": "Earn 500 total points", "unlocked": profile['total_points'] >= 500}
-    ]
-    
-    for achievement in achievements:
-        if achievement['unlocked']:
-            st.success(f"🏆 {achievement['name']}: {achievement['description']}")
+    # Unlock state is kept up to date as metrics change; nothing is evaluated here
+    unlocked = st.session_state.achievements.unlocked
+    for achievement in get_achievement_rules().rules:
+        unlocked_at = unlocked.get(achievement.id)
+        if unlocked_at is not None:
+            unlocked_on = datetime.fromtimestamp(unlocked_at).strftime('%b %d, %Y')
+            st.success(f"🏆 {achievement.name}: {achievement.description} (unlocked {unlocked_on})")
         else:
-            st.info(f"🔒 {achievement['name']}: {achievement['description']}")
+            st.info(f"🔒 {achievement.name}: {achievement.description}")
 
-def main():
-    """Main application function"""
+# Sidebar sections and the function that renders each one
+PAGES = {
+    "🏠 Dashboard": create_dashboard,
+    "👤 Profile Setup": create_profile_setup,
+    "💬 Conversation Practice": create_conversation_practice,
+    "📚 Vocabulary Lessons": create_vocabulary_lessons,
+    "🎤 Pronunciation Practice": create_pronunciation_practice,
+    "🌍 Cultural Insights": create_cultural_insights,
+    "📈 Progress Analytics": create_progress_analytics,
+}
+
+FOOTER_HTML = """
+<div style="text-align: center; color: #666; padding: 2rem;">
+    <p>🌟 Keep learning, keep growing! 🌟</p>
+    <p>Made with ❤️ for language learners worldwide</p>
+</div>
+"""
+
+@st.cache_resource
+def get_metrics_exporter():
+    """Process-wide Prometheus exporter chosen by LANGAPP_METRICS (None when metrics are off)"""
+    return metrics.create_exporter()
+
+@metrics.instrument('rerun')
+def render_app():
+    """Sidebar, the selected page and the footer, then save progress"""
+    track_time_spent()
     
     # Sidebar navigation
     with st.sidebar:
@@ -1030,26 +1376,20 @@ def main():
         # User greeting
         if st.session_state.user_profile['name']:
             st.write(f"Welcome back, {st.session_state.user_profile['name']}! 👋")
+        if get_identity_provider() is not None and st.button("Sign out"):
+            sign_out()
+        if metrics.ENABLED and 'last_profile' in st.session_state:
+            st.caption(f"Last rerun profile: {st.session_state.last_profile}")
         
         # Navigation menu
-        page = st.selectbox(
-            "Choose a section:",
-            [
-                "🏠 Dashboard",
-                "👤 Profile Setup", 
-                "💬 Conversation Practice",
-                "📚 Vocabulary Lessons",
-                "🎤 Pronunciation Practice",
-                "🌍 Cultural Insights",
-                "📈 Progress Analytics"
-            ]
-        )
+        page = st.selectbox("Choose a section:", tuple(PAGES))
         
         # Quick stats in sidebar
         st.markdown("---")
         st.subheader("Quick Stats")
-        st.metric("Points", st.session_state.user_profile['total_points'])
-        st.metric("Streak", f"{st.session_state.user_profile['streak']} days")
+        st.metric("Points", st.session_state.points.total)
+        today = current_time().date()
+        st.metric("Streak", f"{st.session_state.streaks.streak(today)} days")
         
         # Language info
         st.markdown("---")
@@ -1060,39 +1400,40 @@ def main():
         # Daily goal progress
         st.markdown("---")
         st.subheader("Daily Goal")
-        # Simulate daily progress
-        daily_minutes = random.randint(5, st.session_state.user_profile['daily_goal'])
+        # Minutes practiced today, kept current by track_time_spent
+        daily_minutes = round(st.session_state.streaks.seconds_today(today) / 60)
         progress = min(daily_minutes / st.session_state.user_profile['daily_goal'], 1.0)
         st.progress(progress)
         st.write(f"{daily_minutes}/{st.session_state.user_profile['daily_goal']} minutes")
     
+    metrics.count_rerun(page)
+    
     # Main content area
-    if page == "🏠 Dashboard":
-        create_dashboard()
-    elif page == "👤 Profile Setup":
-        create_profile_setup()
-    elif page == "💬 Conversation Practice":
-        create_conversation_practice()
-    elif page == "📚 Vocabulary Lessons":
-        create_vocabulary_lessons()
-    elif page == "🎤 Pronunciation Practice":
-        create_pronunciation_practice()
-    elif page == "🌍 Cultural Insights":
-        create_cultural_insights()
-    elif page == "📈 Progress Analytics":
-        create_progress_analytics()
+    PAGES[page]()
     
     # Footer
     st.markdown("---")
-    st.markdown(
-        """
-        <div style="text-align: center; color: #666; padding: 2rem;">
-            <p>🌟 Keep learning, keep growing! 🌟</p>
-            <p>Made with ❤️ for language learners worldwide</p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+    
+    finish_run()
+
+def main():
+    """Main application function"""
+    # ?profile=cprofile (or =pyinstrument) profiles one rerun while metrics are on
+    profiler = st.query_params.get('profile') if metrics.ENABLED else None
+    # Fragments check this to tell a full rerun from one of their own
+    st.session_state.full_rerun = True
+    try:
+        if profiler is None:
+            render_app()
+        else:
+            # Drop the toggle first so only this rerun is profiled
+            del st.query_params['profile']
+            with metrics.profiled(profiler) as path:
+                st.session_state.last_profile = path
+                render_app()
+    finally:
+        st.session_state.full_rerun = False
 
 if __name__ == "__main__":
     main()
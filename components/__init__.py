@@ -0,0 +1 @@
+"""Reusable UI components for the AI Language Learning Companion"""
@@ -0,0 +1,106 @@
+"""Precompiled HTML templates for the app's repeated card markup
+
+Each template is parsed once, at import, into literal chunks and field names.
+Rendering HTML-escapes every value and joins the chunks, so learner text
+(chat messages above all) can never inject markup. Templates are collapsed
+onto one line, and newlines in values become <br>, so a value can't end the
+surrounding HTML block and have the rest rendered as Markdown. Cards of one
+kind are rendered together and emitted in a single st.markdown call.
+"""
+import html
+from functools import lru_cache
+from string import Formatter
+
+CULTURAL_TIP_CACHE_SIZE = 64
+
+
+def escape(value):
+    """HTML-escaped text, with newlines as <br>"""
+    return html.escape(str(value)).replace('\n', '<br>')
+
+
+class CardTemplate:
+    """HTML with {field} placeholders whose values are always escaped"""
+
+    def __init__(self, markup):
+        markup = ' '.join(line.strip() for line in markup.strip().splitlines())
+        self._parts = tuple((literal, field) for literal, field, _, _ in Formatter().parse(markup))
+
+    def render(self, **values):
+        chunks = []
+        for literal, field in self._parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(escape(values[field]))
+        return ''.join(chunks)
+
+    def render_many(self, rows):
+        """One string for many cards, e.g. [{'tip': ...}, ...]"""
+        return ''.join(self.render(**row) for row in rows)
+
+
+FLASHCARD = CardTemplate("""
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
+    <h2 style="margin: 0; font-size: 3rem;">{word}</h2>
+    <p style="margin: 0.5rem 0 0 0; opacity: 0.8;">Word {position} of {total}</p>
+</div>
+""")
+
+PRACTICE_WORD = CardTemplate("""
+<div style="background: #f0f2f6; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
+    <h3 style="margin: 0; color: #333;">Practice Word:</h3>
+    <h1 style="margin: 0.5rem 0; color: #667eea; font-size: 3rem;">{word}</h1>
+</div>
+""")
+
+PRACTICE_PHRASE = CardTemplate("""
+<div style="background: #f0f2f6; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0;">
+    <h3 style="margin: 0; color: #333;">Practice Phrase:</h3>
+    <h2 style="margin: 0.5rem 0; color: #667eea;">{phrase}</h2>
+</div>
+""")
+
+TONGUE_TWISTER = CardTemplate("""
+<div style="background: #fff3e0; padding: 2rem; border-radius: 10px; text-align: center; margin: 1rem 0; border: 2px solid #ffb74d;">
+    <h3 style="margin: 0; color: #333;">🌪️ Tongue Twister Challenge:</h3>
+    <h2 style="margin: 0.5rem 0; color: #ff9800;">{twister}</h2>
+</div>
+""")
+
+CULTURAL_TIP = CardTemplate("""
+<div class="cultural-tip">
+    <h4>💡 Cultural Tip #{number}</h4>
+    <p>{tip}</p>
+</div>
+""")
+
+SCENARIO_TIP = CardTemplate("""
+<div class="cultural-tip"><strong>💡 Cultural Tip:</strong><br>{tip}</div>
+""")
+
+USER_MESSAGE = CardTemplate("""
+<div class="chat-message user-message"><strong>You:</strong> {content}</div>
+""")
+
+AI_MESSAGE = CardTemplate("""
+<div class="chat-message ai-message"><strong>AI Partner:</strong> {content}</div>
+""")
+
+ACHIEVEMENT_BADGE = CardTemplate("""
+<span class="achievement-badge">{name}</span>
+""")
+
+
+@lru_cache(maxsize=CULTURAL_TIP_CACHE_SIZE)
+def cultural_tips_html(tips):
+    """Every numbered tip card for a language pack's (frozen, hashable) tips, built once"""
+    return CULTURAL_TIP.render_many({'number': number, 'tip': tip} for number, tip in enumerate(tips, 1))
+
+
+def chat_bubbles_html(messages):
+    """Chat history as one block of bubbles"""
+    return ''.join(
+        (USER_MESSAGE if message['role'] == 'user' else AI_MESSAGE).render(content=message['content'])
+        for message in messages
+    )
@@ -0,0 +1,102 @@
+"""Memoized Plotly figure builders
+
+Each builder takes plain tuples and is cached on their content, so a rerun
+with unchanged data reuses the figure built earlier instead of rebuilding it.
+st.cache_resource hands back the cached object itself; st.cache_data would
+pickle and unpickle the figure on every hit, which costs about as much as
+building it. Callers must treat returned figures as read-only.
+
+Plotly is imported inside the builders so that worker processes, and pages
+without charts, never pay for importing it.
+"""
+import streamlit as st
+
+ACCENT_COLOR = 'rgb(102, 126, 234)'
+FIGURE_CACHE_ENTRIES = 512
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def skill_radar_figure(skills, scores):
+    """Radar chart of 0-10 skill scores"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=list(scores),
+        theta=list(skills),
+        fill='toself',
+        name='Your Skills',
+        marker=dict(color=ACCENT_COLOR)
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10]
+            )),
+        showlegend=False,
+        title="Skill Assessment"
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def weekly_points_figure(dates, daily_points):
+    """Line chart of points earned per day"""
+    import plotly.express as px
+
+    fig = px.line(
+        x=list(dates),
+        y=list(daily_points),
+        title="Weekly Learning Activity",
+        labels={'x': 'Date', 'y': 'Points Earned'}
+    )
+    fig.update_traces(line_color=ACCENT_COLOR)
+    return fig
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def pronunciation_scores_figure(scores):
+    """Line chart of recent pronunciation scores"""
+    import plotly.express as px
+
+    fig = px.line(
+        x=list(range(1, len(scores) + 1)),
+        y=list(scores),
+        title="Recent Pronunciation Scores",
+        labels={'x': 'Attempt', 'y': 'Score'}
+    )
+    fig.update_traces(line_color=ACCENT_COLOR)
+    fig.update_layout(yaxis_range=[0, 100])
+    return fig
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def activity_heatmap_figure(day_labels, daily_minutes):
+    """Single-row heatmap of minutes practiced per day"""
+    import plotly.express as px
+
+    fig = px.imshow(
+        [list(daily_minutes)],
+        x=list(day_labels),
+        color_continuous_scale='Blues',
+        title="Daily Learning Activity (Last 30 Days)"
+    )
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="",
+        yaxis_showticklabels=False
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def skill_points_pie_figure(skills, points):
+    """Pie chart of points by skill"""
+    import plotly.express as px
+
+    return px.pie(
+        values=list(points),
+        names=list(skills),
+        title="Points Distribution by Skill"
+    )
@@ -0,0 +1,64 @@
+"""Give every vocabulary word in the language packs a stable ID
+
+Learner progress (mastered words, review queues) is stored by word ID, so IDs
+must never change once assigned. Each pack's `word_ids` table is append-only:
+new words get the next unused ID, and entries for words removed from the
+pack are kept so their IDs are never reused. Run this after adding words.
+
+Usage: python scripts/assign_word_ids.py [LANGUAGE ...]   (default: every pack)
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content import available_languages, language_pack_path  # noqa: E402
+
+
+def assign_ids(pack):
+    """Add IDs for words missing from the pack's table; returns the words added"""
+    word_ids = pack.get('word_ids', {})
+    next_id = max(word_ids.values(), default=-1) + 1
+    added = []
+    for words in pack['vocabulary'].values():
+        for word in words:
+            if word not in word_ids:
+                word_ids[word] = next_id
+                next_id += 1
+                added.append(word)
+    if 'word_ids' not in pack:
+        # Keep the table next to the vocabulary it describes
+        reordered = {}
+        for key, value in pack.items():
+            reordered[key] = value
+            if key == 'translations':
+                reordered['word_ids'] = word_ids
+        reordered.setdefault('word_ids', word_ids)
+        pack.clear()
+        pack.update(reordered)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append stable IDs for new vocabulary words")
+    parser.add_argument('languages', nargs='*', help="languages to update (default: all packs)")
+    args = parser.parse_args()
+
+    for language in args.languages or sorted(available_languages()):
+        path = language_pack_path(language)
+        with open(path, encoding='utf-8') as pack_file:
+            pack = json.load(pack_file)
+        added = assign_ids(pack)
+        if not added:
+            print(f"{language}: all {len(pack['word_ids'])} IDs already assigned")
+            continue
+        with open(path, 'w', encoding='utf-8') as pack_file:
+            json.dump(pack, pack_file, indent=2, ensure_ascii=False)
+            pack_file.write('\n')
+        print(f"{language}: assigned IDs to {len(added)} new words")
+
+
+if __name__ == '__main__':
+    main()
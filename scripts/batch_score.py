@@ -0,0 +1,67 @@
+"""Score a folder of learner recordings in bulk and write a CSV or Parquet report
+
+Recordings are WAV files named after the practice item (`buenos_dias.wav`),
+optionally grouped in one folder per learner. Items default to the language
+pack's vocabulary and tongue twisters; pass --items for a custom word list.
+
+Usage: python scripts/batch_score.py RECORDINGS --language Spanish [--items words.txt]
+                                     [--workers N] [--output report.csv|report.parquet]
+"""
+import argparse
+import os
+import sys
+import time
+
+# One BLAS thread per worker process; parallelism comes from the pool instead
+for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(variable, '1')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_scoring import find_recordings, open_report, score_batch  # noqa: E402
+from utils.content import load_language_pack  # noqa: E402
+
+
+def pack_items(language):
+    """Every vocabulary word and tongue twister in a language pack"""
+    pack = load_language_pack(language)
+    return [word for words in pack['vocabulary'].values() for word in words] + list(pack['tongue_twisters'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk pronunciation scoring over a process pool")
+    parser.add_argument('recordings', help="folder of WAV recordings (searched recursively)")
+    parser.add_argument('--language', required=True, help="language of the recordings, e.g. Spanish")
+    parser.add_argument('--items', help="word list, one item per line (default: the language pack)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='pronunciation_report.csv', help="report path, .csv or .parquet")
+    args = parser.parse_args()
+
+    if args.items:
+        with open(args.items, encoding='utf-8') as word_list:
+            items = [line.strip() for line in word_list if line.strip()]
+    else:
+        items = pack_items(args.language)
+
+    report = open_report(args.output)
+    scored = failed = 0
+    started = time.perf_counter()
+    try:
+        for row in score_batch(args.language, find_recordings(args.recordings, items), args.workers):
+            report.write(row)
+            if row['error']:
+                failed += 1
+            else:
+                scored += 1
+            if (scored + failed) % 100 == 0:
+                print(f"{scored + failed} recordings processed...", file=sys.stderr)
+    finally:
+        report.close()
+    elapsed = time.perf_counter() - started
+    print(f"scored {scored}, failed {failed} in {elapsed:.1f}s "
+          f"({(scored + failed) / elapsed if elapsed else 0:.1f} clips/s on {args.workers} workers)")
+    print(f"report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
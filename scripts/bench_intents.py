@@ -0,0 +1,126 @@
+"""Micro-benchmark: conversation intent matching, legacy vs compiled
+
+Usage: python scripts/bench_intents.py [--seconds 1.0] [--intents 10 100 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content import load_language_pack  # noqa: E402
+from utils.intents import IntentMatcher, get_intent_matcher  # noqa: E402
+
+LANGUAGES = ('Spanish', 'French', 'German')
+
+# Realistic beginner/intermediate learner messages, mixed languages and casing
+CORPUS = [
+    "hola", "Hola! Me llamo Ana", "hi there", "Hello, how are you?", "Bonjour madame",
+    "Buenos días, ¿cómo estás?", "hallo, ich heiße Tom", "Quiero comer algo",
+    "I would like to eat paella please", "Je voudrais manger une crêpe",
+    "Ich möchte etwas essen", "¿Dónde está la estación de tren?", "donde esta el baño",
+    "Où est la gare?", "Wo ist der Bahnhof?", "Can you give me directions to the museum?",
+    "Where can I buy a ticket?", "Me gusta la música y el fútbol", "J'aime lire des livres",
+    "Ich arbeite als Ingenieur in Berlin", "Tengo dos hermanos y una hermana",
+    "Quelle heure est-il?", "Das Wetter ist heute schön", "Estoy aprendiendo español",
+    "Je ne comprends pas", "Können Sie das wiederholen?", "Gracias por tu ayuda",
+    "Merci beaucoup, au revoir", "Ich habe eine Frage zu meinem Flug",
+    "My flight is delayed, what should I do?",
+]
+
+
+def legacy_response(user_input, language):
+    """The pre-compilation get_ai_response: rebuilt table and repeated lower()"""
+    responses = {
+        'Spanish': {
+            'greeting': "¡Hola! Me llamo María. ¿Cómo te llamas?",
+            'food': "¡Excelente elección! ¿Te gustaría algo de beber también?",
+            'directions': "¡Por supuesto! La estación de tren está a dos cuadras hacia el norte.",
+            'general': "Interesante. ¿Puedes contarme más sobre eso?"
+        },
+        'French': {
+            'greeting': "Bonjour! Je m'appelle Marie. Comment vous appelez-vous?",
+            'food': "Excellent choix! Voulez-vous quelque chose à boire aussi?",
+            'directions': "Bien sûr! La gare est à deux pâtés de maisons vers le nord.",
+            'general': "C'est intéressant. Pouvez-vous m'en dire plus?"
+        },
+        'German': {
+            'greeting': "Hallo! Ich heiße Maria. Wie heißen Sie?",
+            'food': "Ausgezeichnete Wahl! Möchten Sie auch etwas trinken?",
+            'directions': "Natürlich! Der Bahnhof ist zwei Blocks nach Norden.",
+            'general': "Das ist interessant. Können Sie mir mehr darüber erzählen?"
+        }
+    }
+    if any(word in user_input.lower() for word in ['hello', 'hi', 'hola', 'bonjour', 'hallo']):
+        return responses[language]['greeting']
+    elif any(word in user_input.lower() for word in ['food', 'eat', 'comida', 'manger', 'essen']):
+        return responses[language]['food']
+    elif any(word in user_input.lower() for word in ['direction', 'where', 'dónde', 'où', 'wo']):
+        return responses[language]['directions']
+    else:
+        return responses[language]['general']
+
+
+def compiled_response(user_input, language):
+    return get_intent_matcher(language).respond(user_input)
+
+
+def synthetic_intents(count):
+    """Intents whose keywords never match the corpus, placed ahead of the real ones"""
+    filler = [{'intent': f'filler{i}', 'keywords': [f'zq{i}x{j}' for j in range(5)], 'response': "..."}
+              for i in range(count)]
+    return filler + list(load_language_pack('Spanish')['intents'])
+
+
+def linear_scan_responder(intents, fallback):
+    """Legacy matching strategy generalised to an arbitrary intent list"""
+    def respond(user_input, language):
+        for intent in intents:
+            if any(word in user_input.lower() for word in intent['keywords']):
+                return intent['response']
+        return fallback
+    return respond
+
+
+def calls_per_second(respond, seconds):
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for language in LANGUAGES:
+            for message in CORPUS:
+                respond(message, language)
+        calls += len(LANGUAGES) * len(CORPUS)
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help="time budget per implementation")
+    parser.add_argument('--intents', type=int, nargs='*', default=[10, 100, 1000],
+                        help="synthetic intent counts for the scaling run")
+    args = parser.parse_args()
+
+    # Warm the pack and matcher caches so only steady-state cost is measured
+    for language in LANGUAGES:
+        load_language_pack(language)
+        compiled_response("", language)
+
+    legacy = calls_per_second(legacy_response, args.seconds)
+    compiled = calls_per_second(compiled_response, args.seconds)
+    print(f"corpus: {len(CORPUS)} messages x {len(LANGUAGES)} languages")
+    print(f"legacy   : {legacy:12,.0f} calls/sec")
+    print(f"compiled : {compiled:12,.0f} calls/sec  ({compiled / legacy:.2f}x)")
+
+    print("\nscaling with intent count (keyword table grows, corpus unchanged)")
+    for count in args.intents:
+        intents = synthetic_intents(count)
+        linear = calls_per_second(linear_scan_responder(intents, "..."), args.seconds)
+        matcher = IntentMatcher(intents, "...")
+        indexed = calls_per_second(lambda text, language: matcher.respond(text), args.seconds)
+        print(f"{len(intents):5d} intents: linear {linear:12,.0f}  compiled {indexed:12,.0f} calls/sec")
+
+
+if __name__ == '__main__':
+    main()
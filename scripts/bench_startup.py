@@ -0,0 +1,105 @@
+"""Startup import-time benchmark, appended to a history file for tracking
+
+Runs `python -X importtime` on everything app.py imports at module level
+(what each new worker pays before first paint) and, separately, on the
+modules the app defers until a page needs them. Each run appends one JSON
+line with the totals and the slowest top-level imports.
+
+Usage: python scripts/bench_startup.py [--runs 5] [--history benchmarks/startup_importtime.jsonl]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'benchmarks', 'startup_importtime.jsonl')
+
+# Imported lazily by the app, measured separately to show what deferral saves
+DEFERRED_MODULES = ('plotly.express', 'plotly.graph_objects', 'numpy')
+
+
+def app_import_statements():
+    """Module-level import statements of app.py, as source lines"""
+    with open(APP_PATH, encoding='utf-8') as app_file:
+        tree = ast.parse(app_file.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements):
+    """Return (total_us, {top_level_module: cumulative_us}) for one cold interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '\n'.join(statements)],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports are the ones without nesting indentation
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative)
+    return sum(modules.values()), modules
+
+
+def interpreter_baseline():
+    """Modules every interpreter imports before running any code (site, encodings, ...)"""
+    return set(measure(['pass'])[1])
+
+
+def best_of(statements, runs):
+    """Fastest of several runs, to filter out scheduler noise"""
+    return min((measure(statements) for _ in range(runs)), key=lambda sample: sample[0])
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track app import time with python -X importtime")
+    parser.add_argument('--runs', type=int, default=5, help="cold interpreter runs per measurement (best is kept)")
+    parser.add_argument('--top', type=int, default=10, help="slowest imports to report")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON-lines file to append results to")
+    args = parser.parse_args()
+
+    baseline = interpreter_baseline()
+    _, startup_modules = best_of(app_import_statements(), args.runs)
+    startup_modules = {name: us for name, us in startup_modules.items() if name not in baseline}
+    startup_total = sum(startup_modules.values())
+    _, deferred_modules = best_of([f"import {name}" for name in DEFERRED_MODULES], args.runs)
+    deferred_total = sum(us for name, us in deferred_modules.items() if name not in baseline)
+    slowest = sorted(startup_modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"app.py module-level imports: {startup_total / 1000:8.1f} ms")
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"deferred until first use:    {deferred_total / 1000:8.1f} ms  ({', '.join(DEFERRED_MODULES)})")
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'startup_us': startup_total,
+        'deferred_us': deferred_total,
+        'slowest': dict(slowest),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'a', encoding='utf-8') as history:
+        history.write(json.dumps(record) + '\n')
+    print(f"appended to {args.history}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""OpenAI-compatible streaming stub for testing the HTTP conversation backend
+
+Answers POST /v1/chat/completions with server-sent events, streaming the
+keyword engine's reply word by word with a configurable per-token delay.
+
+Usage:
+    python scripts/chat_stub_server.py --port 8765 --token-delay 0.05
+    LANGAPP_CHAT_BACKEND=http://127.0.0.1:8765/v1/chat/completions streamlit run app.py
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.conversation_engine import CHUNK_PATTERN  # noqa: E402
+from utils.intents import get_intent_matcher  # noqa: E402
+
+LANGUAGE_PATTERN = re.compile(r"friendly (\w+) conversation partner")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    token_delay = 0.05
+    first_token_delay = 0.2
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        messages = body.get('messages', [])
+        system = next((m['content'] for m in messages if m['role'] == 'system'), '')
+        user = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), '')
+        match = LANGUAGE_PATTERN.search(system)
+        reply = get_intent_matcher(match.group(1) if match else 'Spanish').respond(user)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        time.sleep(self.first_token_delay)
+        for token in CHUNK_PATTERN.findall(reply):
+            event = {'choices': [{'index': 0, 'delta': {'content': token}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(self.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible streaming chat stub")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--token-delay', type=float, default=0.05, help="seconds between streamed tokens")
+    parser.add_argument('--first-token-delay', type=float, default=0.2, help="seconds before the first token")
+    args = parser.parse_args()
+
+    StubHandler.token_delay = args.token_delay
+    StubHandler.first_token_delay = args.first_token_delay
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Chat stub listening on http://{args.host}:{args.port}/v1/chat/completions")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+"""Load test: many simulated learners clicking through one running app at once
+
+Starts `streamlit run app.py` on a free local port and connects simulated
+learners to it over Streamlit's websocket protocol, `--concurrency` at a
+time, exactly as browser tabs on one server would: they share its cached
+resources, profile store, job queue and locks. Each learner walks a scripted
+journey through all seven pages (chatting, flipping flashcards, taking both
+quizzes, listening and practicing pronunciation), and every interaction is
+timed from the click to the end of the script run it causes.
+
+Buttons in the chat, flashcard and quiz fragments must rerun only their
+fragment, and those whose effect shows elsewhere on the page (mastering a
+word, a quiz's last answer) must escalate to a full-page rerun; a click that
+reruns the wrong scope fails the learner. Before the concurrent phase one
+learner walks alone while the server's CPU time is measured per full-page
+and per fragment interaction.
+
+Each run prints interaction latency percentiles and the server process's CPU
+per interaction and per session and resident memory per session, and appends
+them as a JSON line so later changes can be compared against this baseline.
+A run with any failed learner exits non-zero and is not appended. Server CPU
+and memory are read from /proc, so they are only reported on Linux; the
+client shares the machine, so give the run spare cores.
+
+Audio recording widgets can't be driven without a browser, so the journey
+practices pronunciation through the chat page instead.
+
+Usage: python scripts/load_test.py [--sessions 100] [--concurrency 20] [--auth]
+                                   [--history benchmarks/load_test.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'benchmarks', 'load_test.jsonl')
+SERVER_START_TIMEOUT_SECONDS = 60
+
+NAVIGATION = "Choose a section:"
+DASHBOARD = "🏠 Dashboard"
+PROFILE = "👤 Profile Setup"
+CONVERSATION = "💬 Conversation Practice"
+VOCABULARY = "📚 Vocabulary Lessons"
+PRONUNCIATION = "🎤 Pronunciation Practice"
+CULTURE = "🌍 Cultural Insights"
+ANALYTICS = "📈 Progress Analytics"
+
+CHAT_MESSAGES = ("Hola, ¿cómo estás?", "Quiero comer paella", "¿Dónde está el museo?")
+QUIZ_COMPLETED = "Quiz completed!"
+# Safety net for a quiz that never reaches its results screen
+MAX_QUIZ_QUESTIONS = 50
+
+# What an interaction reran
+FULL = 'full'
+FRAGMENT = 'fragment'
+
+
+class LearnerError(Exception):
+    """Raised when a journey step finds the page in an unexpected state"""
+
+
+class Learner:
+    """One simulated browser tab: a websocket session, the page it shows and its widget values"""
+
+    def __init__(self, number, url, timeout, cpu_clock=None):
+        self.number = number
+        self.url = url
+        self.timeout = timeout
+        # Server CPU seconds so far; when given, each interaction's CPU is recorded
+        self.cpu_clock = cpu_clock
+        self.connection = None
+        self.query_string = ''
+        # Delta path -> (fragment ID, Element) of everything on the page
+        self.elements = {}
+        # Widget ID -> (WidgetState field, value), sent with every rerun like the browser does
+        self.widget_values = {}
+        self.latencies = {FULL: [], FRAGMENT: []}
+        self.server_cpu = {FULL: [], FRAGMENT: []}
+        self.errors = 0
+
+    async def connect(self):
+        self.connection = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+
+    async def rerun(self, trigger=None):
+        """Send the widget values, plus a click on `trigger` (fragment ID, widget); returns the scope rerun"""
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.query_string = self.query_string
+        for widget_id, (field, value) in self.widget_values.items():
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, field, value)
+        if trigger is not None:
+            fragment_id, widget = trigger
+            client_state.fragment_id = fragment_id
+            state = client_state.widget_states.widgets.add()
+            state.id = widget.id
+            state.trigger_value = True
+        cpu_before = self.cpu_clock() if self.cpu_clock else None
+        started = time.perf_counter()
+        await self.connection.send(message.SerializeToString())
+        async with asyncio.timeout(self.timeout):
+            scope = await self._receive_run()
+        self.latencies[scope].append(time.perf_counter() - started)
+        if cpu_before is not None:
+            self.server_cpu[scope].append(self.cpu_clock() - cpu_before)
+        for _, element in self.elements.values():
+            if element.WhichOneof('type') == 'exception':
+                raise LearnerError(f"The app raised {element.exception.type}: {element.exception.message}")
+        return scope
+
+    async def _receive_run(self):
+        # A fragment that calls st.rerun() finishes early and a full run follows
+        scope = FRAGMENT
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.connection.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                fragment_ids = set(forward.new_session.fragment_ids_this_run)
+                if not fragment_ids:
+                    scope = FULL
+                    self.elements = {}
+                else:
+                    # A fragment run redraws only that fragment's elements
+                    self.elements = {path: item for path, item in self.elements.items()
+                                     if item[0] not in fragment_ids}
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                self.elements[tuple(forward.metadata.delta_path)] = (forward.delta.fragment_id,
+                                                                     forward.delta.new_element)
+            elif kind == 'page_info_changed':
+                self.query_string = forward.page_info_changed.query_string
+            elif kind == 'script_finished':
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise LearnerError("app.py failed to compile")
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return scope
+
+    def find(self, kind, label):
+        """(fragment ID, widget) of the `kind` element labelled `label`"""
+        for fragment_id, element in self.elements.values():
+            if element.WhichOneof('type') == kind and getattr(element, kind).label == label:
+                return fragment_id, getattr(element, kind)
+        raise LearnerError(f"No {kind} labelled {label!r} on this page")
+
+    def alerts(self):
+        return [element.alert.body for _, element in self.elements.values() if element.WhichOneof('type') == 'alert']
+
+    async def open_page(self, page):
+        _, navigation = self.find('selectbox', NAVIGATION)
+        self.widget_values[navigation.id] = ('string_value', page)
+        await self.rerun()
+
+    async def click(self, label, expect=None):
+        """Click a button; `expect` is the scope it must rerun (FULL or FRAGMENT)"""
+        scope = await self.rerun(self.find('button', label))
+        if expect is not None and scope != expect:
+            raise LearnerError(f"{label!r} caused a {scope} rerun, expected a {expect} one")
+        return scope
+
+    def type_text(self, label, text):
+        _, text_input = self.find('text_input', label)
+        self.widget_values[text_input.id] = ('string_value', text)
+
+    async def finish_quiz(self):
+        """Answer questions until the results screen, however long the quiz is"""
+        for _ in range(MAX_QUIZ_QUESTIONS):
+            scope = await self.click("Submit Answer")
+            completed = any(alert.startswith(QUIZ_COMPLETED) for alert in self.alerts())
+            # Answers rerun only the quiz, except the last, which refreshes the page
+            if completed != (scope == FULL):
+                raise LearnerError(f"Quiz answer caused a {scope} rerun with the quiz "
+                                   f"{'completed' if completed else 'still running'}")
+            if completed:
+                return
+        raise LearnerError(f"Quiz not completed after {MAX_QUIZ_QUESTIONS} answers")
+
+    async def sign_up(self):
+        self.type_text("Choose a username", f"learner{self.number}-{os.getpid()}")
+        self.type_text("Choose a password", "load-test-password")
+        await self.click("Create account")
+
+    async def walk(self, sign_up):
+        """The scripted visit: every page, with the interactions learners use most"""
+        await self.rerun()
+        if sign_up:
+            await self.sign_up()
+        await self.open_page(PROFILE)
+        await self.click("Save Profile", expect=FULL)
+
+        await self.open_page(CONVERSATION)
+        for message in CHAT_MESSAGES:
+            self.type_text("Type your message:", message)
+            await self.click("Send Message", expect=FRAGMENT)
+        self.type_text("Type your message:", CHAT_MESSAGES[0])
+        await self.click("🎤 Practice Pronunciation", expect=FRAGMENT)
+
+        await self.open_page(VOCABULARY)
+        for _ in range(3):
+            await self.click("➡️ Next", expect=FRAGMENT)
+        await self.click("✅ Mark as Mastered", expect=FULL)
+        await self.click("Start Quiz", expect=FRAGMENT)
+        await self.finish_quiz()
+
+        await self.open_page(PRONUNCIATION)
+        await self.click("🔊 Listen to Pronunciation", expect=FULL)
+
+        await self.open_page(CULTURE)
+        await self.click("Start Cultural Quiz", expect=FRAGMENT)
+        await self.finish_quiz()
+
+        await self.open_page(ANALYTICS)
+        await self.open_page(DASHBOARD)
+
+
+async def simulate(number, url, args, cpu_clock=None):
+    """Connect a learner and walk the journey; the connection stays open"""
+    learner = Learner(number, url, args.timeout, cpu_clock)
+    try:
+        await learner.connect()
+        await learner.walk(args.auth)
+    except Exception as exc:
+        learner.errors += 1
+        print(f"learner {number}: {exc!r}", file=sys.stderr)
+    return learner
+
+
+async def simulate_all(url, args):
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def limited(number):
+        async with limit:
+            return await simulate(number, url, args)
+
+    return await asyncio.gather(*(limited(number) for number in range(args.sessions)))
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(port):
+    """`streamlit run app.py` on localhost, once it answers health checks"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.address', '127.0.0.1', '--server.port', str(port), '--server.headless', 'true',
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false',
+         '--global.developmentMode', 'false', '--logger.level', 'error'],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"streamlit exited with status {server.returncode} on startup")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    sys.exit(f"streamlit did not come up within {SERVER_START_TIMEOUT_SECONDS}s")
+
+
+def server_usage(pid):
+    """(CPU seconds, resident bytes) of the server process, or (None, None) without procfs"""
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            # Fields after the parenthesized command name start at field 3 (state)
+            fields = stat.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return None, None
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    return cpu, resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def measure(server, url, args):
+    """Warm up, measure one learner alone, then every learner concurrently"""
+    def cpu_clock():
+        return server_usage(server.pid)[0]
+
+    # Warm-up learner: pays for imports and first-use caches outside the measurement
+    warm_up = await simulate(-1, url, args)
+    solo = await simulate(-2, url, args, cpu_clock if cpu_clock() is not None else None)
+
+    cpu_before, rss_before = server_usage(server.pid)
+    started = time.perf_counter()
+    learners = await simulate_all(url, args)
+    elapsed = time.perf_counter() - started
+    # Measured while every session is still connected, so their memory is counted
+    cpu_after, rss_after = server_usage(server.pid)
+
+    for learner in (warm_up, solo, *learners):
+        await learner.close()
+    usage = None
+    if cpu_before is not None:
+        usage = {'cpu_seconds': cpu_after - cpu_before, 'rss_growth': rss_after - rss_before, 'rss': rss_after}
+    return warm_up.errors + solo.errors, solo, learners, elapsed, usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent learners against one Streamlit server")
+    parser.add_argument('--sessions', type=int, default=100, help="simulated learners in total")
+    parser.add_argument('--concurrency', type=int, default=20, help="learners active at the same time")
+    parser.add_argument('--timeout', type=float, default=30, help="seconds allowed per interaction")
+    parser.add_argument('--auth', action='store_true', help="run with LANGAPP_AUTH=local, signing every learner up")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON-lines file to append results to")
+    args = parser.parse_args()
+
+    # Keep load-test learners out of the real database unless told otherwise
+    os.environ.setdefault('LANGAPP_STORE', 'memory')
+    if args.auth:
+        os.environ['LANGAPP_AUTH'] = 'local'
+        os.environ.setdefault('LANGAPP_USERS_PATH', os.path.join(REPO_ROOT, 'benchmarks', 'load_test_users.json'))
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        setup_errors, solo, learners, elapsed, usage = asyncio.run(
+            measure(server, f'ws://127.0.0.1:{port}/_stcore/stream', args))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    by_scope = {scope: [latency for learner in learners for latency in learner.latencies[scope]]
+                for scope in (FULL, FRAGMENT)}
+    latencies = by_scope[FULL] + by_scope[FRAGMENT]
+    errors = setup_errors + sum(learner.errors for learner in learners)
+    if not latencies:
+        sys.exit("no interactions completed; see errors above")
+
+    def solo_cpu(scope):
+        samples = solo.server_cpu[scope]
+        return statistics.fmean(samples) if samples else None
+
+    result = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'driver': 'websocket',
+        'sessions': args.sessions,
+        'concurrency': args.concurrency,
+        'auth': args.auth,
+        'reruns': len(latencies),
+        'fragment_reruns': len(by_scope[FRAGMENT]),
+        'errors': errors,
+        'reruns_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': milliseconds(percentile(latencies, 0.50)),
+        'p95_ms': milliseconds(percentile(latencies, 0.95)),
+        'p99_ms': milliseconds(percentile(latencies, 0.99)),
+        'mean_ms': milliseconds(statistics.fmean(latencies)),
+        'full_p50_ms': milliseconds(percentile(by_scope[FULL], 0.50)) if by_scope[FULL] else None,
+        'fragment_p50_ms': milliseconds(percentile(by_scope[FRAGMENT], 0.50)) if by_scope[FRAGMENT] else None,
+        'solo_cpu_ms_per_full_rerun': milliseconds(solo_cpu(FULL)),
+        'solo_cpu_ms_per_fragment_rerun': milliseconds(solo_cpu(FRAGMENT)),
+        'cpu_ms_per_rerun': None,
+        'cpu_s_per_session': None,
+        'rss_kib_per_session': None,
+        'server_rss_mib': None,
+    }
+    if usage is not None:
+        result.update({
+            'cpu_ms_per_rerun': round(usage['cpu_seconds'] / len(latencies) * 1000, 2),
+            'cpu_s_per_session': round(usage['cpu_seconds'] / args.sessions, 3),
+            'rss_kib_per_session': round(usage['rss_growth'] / args.sessions / 1024, 1),
+            'server_rss_mib': round(usage['rss'] / 2 ** 20, 1),
+        })
+
+    print(f"{args.sessions} learners, {args.concurrency} at a time, one server: "
+          f"{result['reruns']} interactions ({result['fragment_reruns']} fragment-only) "
+          f"in {elapsed:.1f}s ({result['reruns_per_second']}/s), {errors} errors")
+    print(f"latency        p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+          f"(full p50 {result['full_p50_ms']} ms, fragment p50 {result['fragment_p50_ms']} ms)")
+    print(f"server cpu     {result['cpu_ms_per_rerun']} ms/interaction  {result['cpu_s_per_session']} s/session  "
+          f"(alone: full {result['solo_cpu_ms_per_full_rerun']} ms, "
+          f"fragment {result['solo_cpu_ms_per_fragment_rerun']} ms)")
+    print(f"server memory  {result['rss_kib_per_session']} KiB RSS/session  {result['server_rss_mib']} MiB total")
+
+    if errors:
+        # A run with failures isn't comparable, so it never becomes a baseline
+        sys.exit(f"{errors} learner errors; results not appended to {args.history}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'a', encoding='utf-8') as history:
+        history.write(json.dumps(result) + '\n')
+    print(f"appended to {args.history}")
+
+
+if __name__ == '__main__':
+    main()
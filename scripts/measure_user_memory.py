@@ -0,0 +1,181 @@
+"""Memory cost of shared content vs. each additional learner
+
+Loads every language's content the way the app shares it across sessions
+(packs, vocabulary indexes, quiz generators, intent matchers), then builds
+the per-learner session state of many simulated active learners and reports
+the tracemalloc delta per learner, broken down by component, alongside the
+size of the learner's persisted snapshot.
+
+Usage: python scripts/measure_user_memory.py [--learners 200] [--days 90] [--chat-messages 40]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import activity, points  # noqa: E402
+from utils.achievements import ACHIEVEMENTS, AchievementRules, AchievementTracker  # noqa: E402
+from utils.activity import ActivityRollups  # noqa: E402
+from utils.content import available_languages, load_conversation_scenarios, load_language_pack  # noqa: E402
+from utils.intents import get_intent_matcher  # noqa: E402
+from utils.points import PointsLedger  # noqa: E402
+from utils.pronunciation_log import PronunciationLog  # noqa: E402
+from utils.quiz import QuizGenerator  # noqa: E402
+from utils.srs import ReviewScheduler  # noqa: E402
+from utils.streaks import StreakTracker  # noqa: E402
+from utils.vocabulary import MasteredVocabulary, VocabularyIndex  # noqa: E402
+
+TODAY = date(2026, 1, 1)
+
+
+def load_shared_content():
+    """Everything the app keeps once per process, keyed by language"""
+    content = {'scenarios': load_conversation_scenarios(), 'rules': AchievementRules(ACHIEVEMENTS)}
+    for language in sorted(available_languages()):
+        pack = load_language_pack(language)
+        index = VocabularyIndex(pack['vocabulary'], pack.get('translations'), pack.get('word_ids'))
+        content[language] = (pack, index, QuizGenerator(index), get_intent_matcher(language))
+    return content
+
+
+def build_profile(rng, language, args):
+    return {
+        'name': f"Learner {rng.randrange(10 ** 6)}", 'native_language': 'English', 'target_language': language,
+        'level': 'Beginner', 'daily_goal': 20, 'interests': ['Travel', 'Food'], 'timezone': 'Europe/Madrid',
+        'lessons_completed': rng.randrange(50), 'conversations_had': rng.randrange(100),
+        'last_login': '2026-01-01T09:00:00',
+    }
+
+
+def build_chat(rng, language, args):
+    return [{'role': 'user' if turn % 2 == 0 else 'assistant',
+             'content': f"Message {turn} about {rng.choice(['comida', 'viaje', 'familia'])}, ¿qué tal?"}
+            for turn in range(args.chat_messages)]
+
+
+def build_rollups(rng, language, args):
+    rollups = ActivityRollups()
+    kinds = (activity.POINTS, activity.TIME_SPENT, activity.QUIZ_CORRECT, activity.MESSAGE_SENT, activity.LISTEN)
+    for offset in range(args.days, 0, -1):
+        for kind in rng.sample(kinds, 3):
+            rollups.add(TODAY - timedelta(days=offset), kind, rng.randrange(1, 300))
+    return rollups
+
+
+def build_mastered(rng, language, args, content):
+    mastered = MasteredVocabulary()
+    ids = content[language][1].ids
+    for word_id in rng.sample(ids, min(args.words, len(ids))):
+        mastered.add(language, word_id)
+    return mastered
+
+
+def build_reviews(rng, language, args, content):
+    scheduler = ReviewScheduler()
+    for word_id in content[language][1].ids[:args.words]:
+        scheduler.add(word_id, 0.0)
+        scheduler.review(word_id, rng.choice((1, 3, 4, 5)), 0.0)
+    return scheduler
+
+
+def build_pronunciation_log(rng, language, args, content):
+    log = PronunciationLog()
+    words = content[language][1].words
+    for attempt in range(200):
+        log.record('word', rng.choice(words), rng.randrange(40, 100), float(attempt))
+    return log
+
+
+def build_points(rng, language, args):
+    ledger = PointsLedger()
+    for _ in range(300):
+        source = rng.choice(list(points.POINT_SOURCES))
+        ledger.award(source, 5, rng.random() * 10 ** 6)
+    return ledger
+
+
+def build_streaks(rng, language, args):
+    streaks = StreakTracker()
+    for offset in range(args.days, 0, -1):
+        streaks.record_activity(TODAY - timedelta(days=offset))
+    streaks.add_time(TODAY, 900.0)
+    return streaks
+
+
+def build_achievements(rng, language, args, content):
+    tracker = AchievementTracker(content['rules'])
+    tracker.update('lessons_completed', 10, 1.0)
+    tracker.update('conversations_had', 10, 2.0)
+    return tracker
+
+
+# Component name -> builder(rng, language, args[, content])
+COMPONENTS = {
+    'profile': build_profile,
+    'conversation_history': build_chat,
+    'activity_rollups': build_rollups,
+    'mastered_vocabulary': build_mastered,
+    'review_schedule': build_reviews,
+    'pronunciation_log': build_pronunciation_log,
+    'points_ledger': build_points,
+    'streaks': build_streaks,
+    'achievements': build_achievements,
+}
+NEEDS_CONTENT = {'mastered_vocabulary', 'review_schedule', 'pronunciation_log', 'achievements'}
+
+
+def build(name, rng, language, args, content):
+    builder = COMPONENTS[name]
+    return builder(rng, language, args, content) if name in NEEDS_CONTENT else builder(rng, language, args)
+
+
+def snapshot(value):
+    return value if isinstance(value, (dict, list)) else value.to_dict()
+
+
+def measure(fn):
+    """(result, bytes allocated and still alive) for one call"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-learner memory against shared content")
+    parser.add_argument('--learners', type=int, default=200, help="simulated concurrent learners")
+    parser.add_argument('--days', type=int, default=90, help="days of activity history per learner")
+    parser.add_argument('--words', type=int, default=120, help="mastered / scheduled words per learner")
+    parser.add_argument('--chat-messages', type=int, default=40, help="chat messages kept in each session")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    content, shared_bytes = measure(load_shared_content)
+    languages = sorted(available_languages())
+    print(f"shared content ({len(languages)} languages): {shared_bytes / 1024:8.1f} KiB, once per process")
+
+    rng = random.Random(0)
+    print(f"\nper learner, averaged over {args.learners} learners:")
+    total = 0
+    snapshot_bytes = 0
+    for name in COMPONENTS:
+        states, allocated = measure(lambda: [build(name, rng, rng.choice(languages), args, content)
+                                             for _ in range(args.learners)])
+        per_learner = allocated / args.learners
+        total += per_learner
+        snapshot_bytes += sum(len(json.dumps(snapshot(state))) for state in states) / args.learners
+        print(f"  {name:22} {per_learner / 1024:8.2f} KiB")
+        del states
+    print(f"  {'total':22} {total / 1024:8.2f} KiB in memory, "
+          f"{snapshot_bytes / 1024:.2f} KiB persisted as JSON")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Utility modules for the AI Language Learning Companion"""
@@ -0,0 +1,96 @@
+"""Event-driven achievements
+
+Rules are declared once as a threshold on a named metric and compiled into a
+per-metric list sorted by threshold. When a metric changes, only that metric's
+rules are consulted, and a per-learner cursor past the already unlocked ones
+makes the common case (nothing new unlocked) a single comparison however
+many rules exist.
+"""
+import itertools
+from bisect import bisect_right
+from collections import namedtuple
+
+# Metrics the app reports whenever they change
+TOTAL_POINTS = 'total_points'
+LESSONS_COMPLETED = 'lessons_completed'
+CONVERSATIONS_HAD = 'conversations_had'
+WORDS_MASTERED = 'words_mastered'
+BEST_PRONUNCIATION_SCORE = 'best_pronunciation_score'
+STREAK_DAYS = 'streak_days'
+
+Achievement = namedtuple('Achievement', ('id', 'name', 'description', 'metric', 'threshold'))
+
+ACHIEVEMENTS = (
+    Achievement('first_steps', "First Steps", "Complete your first lesson", LESSONS_COMPLETED, 1),
+    Achievement('chatterbox', "Chatterbox", "Have 5 conversations", CONVERSATIONS_HAD, 5),
+    Achievement('word_master', "Word Master", "Master 20 vocabulary words", WORDS_MASTERED, 20),
+    Achievement('pronunciation_pro', "Pronunciation Pro", "Score 90+ on pronunciation", BEST_PRONUNCIATION_SCORE, 90),
+    Achievement('streak_keeper', "Streak Keeper", "Maintain a 7-day streak", STREAK_DAYS, 7),
+    Achievement('point_collector', "Point Collector", "Earn 500 total points", TOTAL_POINTS, 500),
+)
+
+
+class AchievementRules:
+    """Rules grouped by metric and sorted by threshold; shared by every learner"""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.by_id = {rule.id: rule for rule in self.rules}
+        grouped = {}
+        for rule in self.rules:
+            grouped.setdefault(rule.metric, []).append(rule)
+        self.by_metric = {
+            metric: tuple(sorted(metric_rules, key=lambda rule: rule.threshold))
+            for metric, metric_rules in grouped.items()
+        }
+        self.thresholds = {metric: [rule.threshold for rule in metric_rules]
+                           for metric, metric_rules in self.by_metric.items()}
+
+
+class AchievementTracker:
+    """One learner's unlocked achievements with their unlock times"""
+
+    def __init__(self, rules, unlocked=None):
+        self.rules = rules
+        # Achievement ID -> unlock timestamp, in unlock order
+        self.unlocked = dict(unlocked or {})
+        # Per metric, index of the lowest-threshold rule not yet unlocked
+        self._cursor = {}
+        for metric, metric_rules in rules.by_metric.items():
+            cursor = 0
+            while cursor < len(metric_rules) and metric_rules[cursor].id in self.unlocked:
+                cursor += 1
+            self._cursor[metric] = cursor
+        # Bumped when something unlocks; the cursors aren't persisted, so moving them doesn't count
+        self.version = 0
+
+    def update(self, metric, value, now):
+        """Unlock the rules on `metric` that `value` now meets; returns the newly unlocked ones"""
+        metric_rules = self.rules.by_metric.get(metric)
+        if not metric_rules:
+            return []
+        cursor = self._cursor[metric]
+        if cursor == len(metric_rules) or value < metric_rules[cursor].threshold:
+            return []
+        end = bisect_right(self.rules.thresholds[metric], value)
+        unlocked = []
+        for rule in metric_rules[cursor:end]:
+            if rule.id not in self.unlocked:
+                self.unlocked[rule.id] = now
+                unlocked.append(rule)
+        self._cursor[metric] = end
+        if unlocked:
+            self.version += 1
+        return unlocked
+
+    def is_unlocked(self, achievement_id):
+        return achievement_id in self.unlocked
+
+    def recent(self, limit):
+        """Most recently unlocked achievements, newest first"""
+        recent_ids = (achievement_id for achievement_id in reversed(self.unlocked)
+                      if achievement_id in self.rules.by_id)
+        return [self.rules.by_id[achievement_id] for achievement_id in itertools.islice(recent_ids, limit)]
+
+    def to_dict(self):
+        return dict(self.unlocked)
@@ -0,0 +1,112 @@
+"""Learner activity tracking with pre-aggregated daily rollups
+
+Raw events are appended to the profile store's event log and never read back
+by the UI. Each session instead keeps per-day totals for every event kind, so
+charts cost O(days) no matter how long a learner's history is. Totals are
+held as one float array per kind over a contiguous day range (8 bytes per
+kind-day) rather than a dict per day, since they are part of every
+concurrent learner's session.
+"""
+from array import array
+from datetime import date, timedelta
+
+# Event kinds recorded by the app
+POINTS = 'points'
+LESSON_COMPLETED = 'lesson_completed'
+PRONUNCIATION_ATTEMPT = 'pronunciation_attempt'
+TIME_SPENT = 'seconds'
+QUIZ_CORRECT = 'quiz_correct'
+LISTEN = 'listen'
+CULTURAL_ANSWER = 'cultural_answer'
+MESSAGE_SENT = 'message_sent'
+
+ROLLUP_RETENTION_DAYS = 400
+
+
+class ActivityRollups:
+    """Per-day totals by event kind; serialized as {'YYYY-MM-DD': {kind: total}}"""
+
+    def __init__(self, days=None):
+        # Ordinal of the day at index 0 of every kind's array
+        self._first = None
+        self._totals = {}
+        # Bumped on every change, so callers can skip re-serializing unchanged rollups
+        self.version = 0
+        for key in sorted(days or {}):
+            for kind, amount in days[key].items():
+                self.add(date.fromisoformat(key), kind, amount)
+
+    def add(self, day, kind, amount=1):
+        """Fold one event into its day's totals"""
+        ordinal = day.toordinal()
+        if self._first is None:
+            self._first = ordinal
+        elif ordinal < self._first:
+            # Only after a clock or timezone change moves "today" backwards
+            padding = self._first - ordinal
+            for name, totals in self._totals.items():
+                self._totals[name] = array('d', bytes(8 * padding)) + totals
+            self._first = ordinal
+        index = ordinal - self._first
+        totals = self._totals.get(kind)
+        if totals is None:
+            totals = self._totals[kind] = array('d')
+        if index >= len(totals):
+            totals.frombytes(bytes(8 * (index + 1 - len(totals))))
+            self._prune(ordinal)
+            index = ordinal - self._first
+        totals[index] += amount
+        self.version += 1
+
+    def total(self, day, kind):
+        """Total for one kind on one day"""
+        totals = self._totals.get(kind)
+        if totals is None:
+            return 0
+        index = day.toordinal() - self._first
+        return _number(totals[index]) if 0 <= index < len(totals) else 0
+
+    def series(self, kind, days, today):
+        """Daily totals for the last `days` days, oldest first, ending today"""
+        return [self.total(today - timedelta(days=offset), kind) for offset in range(days - 1, -1, -1)]
+
+    def window_total(self, kind, days, today):
+        """Sum of a kind over the last `days` days"""
+        return sum(self.series(kind, days, today))
+
+    def active_days(self, ignore=()):
+        """Days with a nonzero total for any kind not in `ignore`, oldest first"""
+        span = max((len(totals) for kind, totals in self._totals.items() if kind not in ignore), default=0)
+        for index in range(span):
+            if any(index < len(totals) and totals[index]
+                   for kind, totals in self._totals.items() if kind not in ignore):
+                yield date.fromordinal(self._first + index)
+
+    def to_dict(self):
+        days = {}
+        for kind, totals in self._totals.items():
+            for index, amount in enumerate(totals):
+                if amount:
+                    days.setdefault(date.fromordinal(self._first + index).isoformat(), {})[kind] = _number(amount)
+        return days
+
+    def _prune(self, today):
+        # Called only when a day extends an array, so pruning stays off the hot path
+        cutoff = today - ROLLUP_RETENTION_DAYS
+        if cutoff <= self._first:
+            return
+        drop = cutoff - self._first
+        for totals in self._totals.values():
+            del totals[:drop]
+        self._first = cutoff
+
+
+def _number(amount):
+    """Counts come back as ints, durations stay floats"""
+    return int(amount) if amount.is_integer() else amount
+
+
+def day_labels(days, today):
+    """Dates matching ActivityRollups.series(…, days, today)"""
+    return [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
@@ -0,0 +1,109 @@
+"""Sign-in for multi-user deployments
+
+With LANGAPP_AUTH=local, learners sign in with a username and password
+before any progress is loaded, and their profile is keyed by the account's
+user ID rather than by an ID in the URL. The local provider is a stand-in for
+a real identity provider: accounts live in a JSON file with salted PBKDF2
+password hashes.
+"""
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import threading
+import uuid
+
+from utils.content import DATA_DIR
+
+DEFAULT_USERS_PATH = os.path.join(DATA_DIR, 'users.json')
+PBKDF2_ITERATIONS = 200_000
+MIN_PASSWORD_LENGTH = 8
+
+
+class AuthError(Exception):
+    """Raised when an account cannot be created"""
+
+
+class IdentityProvider:
+    """Maps credentials to a stable user ID"""
+
+    def authenticate(self, username, password):
+        """User ID for valid credentials, else None"""
+        raise NotImplementedError
+
+    def register(self, username, password):
+        """Create an account and return its user ID"""
+        raise NotImplementedError
+
+
+class LocalIdentityProvider(IdentityProvider):
+    """Accounts in a local JSON file: {username: {user_id, salt, hash}}"""
+
+    def __init__(self, path=DEFAULT_USERS_PATH, iterations=PBKDF2_ITERATIONS):
+        self.path = path
+        self.iterations = iterations
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as users_file:
+                self._accounts = json.load(users_file)
+        except FileNotFoundError:
+            self._accounts = {}
+
+    def authenticate(self, username, password):
+        with self._lock:
+            account = self._accounts.get(self._normalize(username))
+        if account is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            self._hash(password, b'\0' * 16)
+            return None
+        expected = bytes.fromhex(account['hash'])
+        if hmac.compare_digest(self._hash(password, bytes.fromhex(account['salt'])), expected):
+            return account['user_id']
+        return None
+
+    def register(self, username, password):
+        key = self._normalize(username)
+        if not key:
+            raise AuthError("Choose a username")
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise AuthError(f"Passwords need at least {MIN_PASSWORD_LENGTH} characters")
+        salt = secrets.token_bytes(16)
+        account = {'user_id': uuid.uuid4().hex, 'salt': salt.hex(), 'hash': self._hash(password, salt).hex()}
+        with self._lock:
+            if key in self._accounts:
+                raise AuthError("That username is taken")
+            self._accounts[key] = account
+            self._save()
+        return account['user_id']
+
+    def _hash(self, password, salt):
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, self.iterations)
+
+    @staticmethod
+    def _normalize(username):
+        return username.strip().casefold()
+
+    def _save(self):
+        # Write then rename, so a crash never leaves a truncated accounts file
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as users_file:
+                json.dump(self._accounts, users_file)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def create_identity_provider():
+    """Provider chosen by LANGAPP_AUTH ('none' or 'local'); None means anonymous learners"""
+    mode = os.environ.get('LANGAPP_AUTH', 'none')
+    if mode == 'none':
+        return None
+    if mode == 'local':
+        return LocalIdentityProvider(os.environ.get('LANGAPP_USERS_PATH', DEFAULT_USERS_PATH))
+    raise ValueError(f"Unknown LANGAPP_AUTH mode: {mode!r}")
@@ -0,0 +1,132 @@
+"""Bulk pronunciation scoring of a folder of recordings over a process pool
+
+Recordings are fanned out to one worker process per core; each worker reads
+and scores its own files, so only paths and scores cross process boundaries,
+and keeps its own cache of reference features. As in the app, items without
+a recorded reference are scored against synthesized speech. Results are yielded as soon
+as each clip finishes so reports can be written while the batch is running.
+"""
+import csv
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from utils.pronunciation import PronunciationError, score_recording, slugify
+from utils.reference_audio import create_audio_cache
+
+REPORT_FIELDS = ('learner', 'item', 'path', 'score', 'error')
+# Tasks queued per worker: enough to keep every core busy without
+# materializing the whole folder as futures up front
+IN_FLIGHT_PER_WORKER = 4
+PARQUET_ROW_GROUP = 1024
+
+
+def find_recordings(root, items):
+    """(learner, item, path) for every WAV under root, matched to items by file name
+
+    `buenos_dias.wav` matches "Buenos días". The learner is the recording's
+    folder relative to root ('' at the top level); files that match no item
+    are returned with item None so they show up in the report.
+    """
+    by_slug = {slugify(item): item for item in items}
+    for folder, subfolders, filenames in os.walk(root):
+        subfolders.sort()
+        learner = os.path.relpath(folder, root)
+        for filename in sorted(filenames):
+            stem, extension = os.path.splitext(filename)
+            if extension.lower() == '.wav':
+                yield ('' if learner == '.' else learner), by_slug.get(slugify(stem)), os.path.join(folder, filename)
+
+
+@lru_cache(maxsize=None)
+def _audio_cache():
+    """One audio cache per worker process, for synthesized references"""
+    return create_audio_cache()
+
+
+def score_file(language, item, path):
+    """Worker body: (score, error) for one recording"""
+    if item is None:
+        return None, "No item in the word list matches this file name"
+    try:
+        with open(path, 'rb') as recording:
+            return score_recording(language, item, recording.read(), _audio_cache()), ''
+    except (OSError, PronunciationError) as exc:
+        return None, str(exc)
+    except Exception as exc:
+        # One malformed file must not stop the batch; it becomes a report row
+        return None, f"Scoring failed: {exc!r}"
+
+
+def score_batch(language, recordings, workers=None):
+    """Yield a report row per (learner, item, path) as each one finishes scoring"""
+    workers = workers or os.cpu_count() or 1
+    recordings = iter(recordings)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        while True:
+            for learner, item, path in recordings:
+                future = executor.submit(score_file, language, item, path)
+                in_flight[future] = (learner, item, path)
+                if len(in_flight) >= workers * IN_FLIGHT_PER_WORKER:
+                    break
+            if not in_flight:
+                return
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                learner, item, path = in_flight.pop(future)
+                score, error = future.result()
+                yield {'learner': learner, 'item': item or '', 'path': path, 'score': score, 'error': error}
+
+
+class CSVReport:
+    """Writes report rows as they arrive, flushing each so partial results survive"""
+
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=REPORT_FIELDS)
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetReport:
+    """Writes report rows to Parquet in row groups (requires pyarrow)"""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ('learner', pa.string()), ('item', pa.string()), ('path', pa.string()),
+            ('score', pa.int16()), ('error', pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+
+def open_report(path):
+    """CSV or Parquet report writer, chosen by the file extension"""
+    if path.lower().endswith('.parquet'):
+        return ParquetReport(path)
+    return CSVReport(path)
@@ -0,0 +1,74 @@
+"""Lazily loaded content packs (one JSON file per language)
+
+A pack holds everything language-specific: vocabulary categories, cultural
+tips, the cultural quiz, tongue twisters and conversation responses. Packs
+are read on first use and kept in a size-bounded LRU cache, so languages
+nobody picks cost neither startup time nor memory.
+
+Content is shared by every session in the process, so it is frozen on load
+(read-only mappings and tuples): no learner's session can alter what another
+sees, and concurrent first requests for a pack load it only once.
+"""
+import functools
+import json
+import os
+import threading
+from types import MappingProxyType
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+LANGUAGE_PACK_DIR = os.path.join(DATA_DIR, 'languages')
+PACK_CACHE_SIZE = int(os.environ.get('LANGAPP_PACK_CACHE_SIZE', '8'))
+
+
+_load_lock = threading.Lock()
+
+
+def freeze(value):
+    """Deep read-only copy of parsed JSON: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def language_pack_path(language):
+    """Path of the content pack file for a language"""
+    return os.path.join(LANGUAGE_PACK_DIR, f"{language.lower()}.json")
+
+
+@functools.lru_cache(maxsize=1)
+def available_languages():
+    """Languages that have a content pack, found without reading the packs"""
+    names = sorted(os.listdir(LANGUAGE_PACK_DIR)) if os.path.isdir(LANGUAGE_PACK_DIR) else []
+    return frozenset(name[:-len('.json')].title() for name in names if name.endswith('.json'))
+
+
+def has_language_pack(language):
+    """True if content exists for a language"""
+    return language in available_languages()
+
+
+def load_language_pack(language):
+    """A language's content pack, read-only and shared by every session"""
+    # lru_cache alone would let two threads missing at once both read the file
+    with _load_lock:
+        return _read_language_pack(language)
+
+
+@functools.lru_cache(maxsize=PACK_CACHE_SIZE)
+def _read_language_pack(language):
+    with open(language_pack_path(language), encoding='utf-8') as pack_file:
+        return freeze(json.load(pack_file))
+
+
+def load_conversation_scenarios():
+    """Conversation scenarios by level, read-only and shared by every session"""
+    with _load_lock:
+        return _read_conversation_scenarios()
+
+
+@functools.lru_cache(maxsize=1)
+def _read_conversation_scenarios():
+    with open(os.path.join(DATA_DIR, 'scenarios.json'), encoding='utf-8') as scenarios_file:
+        return freeze(json.load(scenarios_file))
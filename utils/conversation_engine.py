@@ -0,0 +1,190 @@
+"""Pluggable conversation backends with streaming output and a reply cache
+
+The engine streams a backend's reply chunk by chunk under a hard deadline and
+caches complete replies keyed on (language, scenario, normalized input), so
+repeated beginner phrases are answered without touching the backend again.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.intents import get_intent_matcher, normalize_text
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CACHE_SIZE = 2048
+DEFAULT_STREAM_WORKERS = 16
+TIMEOUT_NOTICE = " …"
+CHUNK_PATTERN = re.compile(r"\S+\s*")
+_END_OF_STREAM = object()
+
+
+class ConversationBackend:
+    """Produces a reply to a learner message as a stream of text chunks"""
+
+    # Backends that answer from memory skip the worker thread and deadline
+    runs_inline = False
+
+    def stream(self, language, scenario, context, text, timeout):
+        raise NotImplementedError
+
+
+class KeywordBackend(ConversationBackend):
+    """Canned replies from the language pack's compiled keyword intents"""
+
+    runs_inline = True
+
+    def stream(self, language, scenario, context, text, timeout):
+        yield from CHUNK_PATTERN.findall(get_intent_matcher(language).respond(text))
+
+
+class HTTPBackend(ConversationBackend):
+    """Streams from an OpenAI-compatible /v1/chat/completions endpoint"""
+
+    def __init__(self, url, model='local'):
+        self.url = url
+        self.model = model
+
+    def stream(self, language, scenario, context, text, timeout):
+        # Deferred: urllib.request pulls in http.client, email and ssl at import
+        import urllib.request
+
+        payload = {
+            'model': self.model,
+            'stream': True,
+            'messages': [
+                {'role': 'system', 'content': (
+                    f"You are a friendly {language} conversation partner for a language learner. "
+                    f"Scenario: {scenario}. {context} Reply briefly and only in {language}."
+                )},
+                {'role': 'user', 'content': text}
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'}
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            for raw_line in response:
+                line = raw_line.decode('utf-8').strip()
+                if not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                delta = choices[0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
+
+
+class ReplyCache:
+    """Thread-safe LRU cache of complete replies"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            reply = self._entries.get(key)
+            if reply is not None:
+                self._entries.move_to_end(key)
+            return reply
+
+    def put(self, key, reply):
+        with self._lock:
+            self._entries[key] = reply
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def cache_key(language, scenario, text):
+    """Cache key that treats case, accents and spacing variants as the same input"""
+    return (language, scenario, ' '.join(normalize_text(text).split()))
+
+
+class ConversationEngine:
+    """Streams replies from a backend with a hard timeout and response caching"""
+
+    def __init__(self, backend, timeout=DEFAULT_TIMEOUT, cache_size=DEFAULT_CACHE_SIZE,
+                 fallback=None, max_workers=DEFAULT_STREAM_WORKERS):
+        self.backend = backend
+        self.timeout = timeout
+        self.cache = ReplyCache(cache_size)
+        self.fallback = fallback or KeywordBackend()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-stream")
+
+    def stream_reply(self, language, scenario, context, text):
+        """Yield reply chunks; complete replies are cached for identical inputs"""
+        key = cache_key(language, scenario, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        try:
+            for chunk in self._stream_from(self.backend, language, scenario, context, text):
+                chunks.append(chunk)
+                yield chunk
+        except Exception:
+            if chunks:
+                # Part of the reply already reached the learner; mark it cut short
+                yield TIMEOUT_NOTICE
+                return
+            # Nothing was shown yet, so answer from the keyword backend instead
+            yield from self.fallback.stream(language, scenario, context, text, self.timeout)
+            return
+        self.cache.put(key, ''.join(chunks))
+
+    def _stream_from(self, backend, language, scenario, context, text):
+        if backend.runs_inline:
+            yield from backend.stream(language, scenario, context, text, self.timeout)
+            return
+
+        deadline = time.monotonic() + self.timeout
+        chunks = queue.Queue()
+
+        def produce():
+            try:
+                for chunk in backend.stream(language, scenario, context, text, self.timeout):
+                    chunks.put(chunk)
+                    if time.monotonic() > deadline:
+                        break
+            except Exception as exc:
+                chunks.put(exc)
+            chunks.put(_END_OF_STREAM)
+
+        self._executor.submit(produce)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Conversation backend exceeded its deadline")
+            try:
+                chunk = chunks.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("Conversation backend exceeded its deadline")
+            if chunk is _END_OF_STREAM:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+def create_engine():
+    """Build the engine configured by LANGAPP_CHAT_* environment variables"""
+    url = os.environ.get('LANGAPP_CHAT_BACKEND', 'keyword')
+    if url == 'keyword':
+        backend = KeywordBackend()
+    else:
+        backend = HTTPBackend(url, model=os.environ.get('LANGAPP_CHAT_MODEL', 'local'))
+    timeout = float(os.environ.get('LANGAPP_CHAT_TIMEOUT', DEFAULT_TIMEOUT))
+    return ConversationEngine(backend, timeout=timeout)
@@ -0,0 +1,81 @@
+"""Compiled keyword intent matching for the conversation partner
+
+Each language pack declares its intents in priority order. They are compiled
+once into a single keyword -> intent map, so matching a message costs one
+normalization pass plus a dict lookup per token, regardless of how many
+intents or keywords a language has.
+"""
+import functools
+import re
+import unicodedata
+
+from utils.content import PACK_CACHE_SIZE, load_language_pack
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class _AccentFolds(dict):
+    """str.translate table that strips combining marks, filled lazily per character"""
+
+    def __missing__(self, codepoint):
+        decomposed = unicodedata.normalize('NFKD', chr(codepoint))
+        folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+        self[codepoint] = folded
+        return folded
+
+
+_ACCENT_FOLDS = _AccentFolds()
+
+
+def normalize_text(text):
+    """Casefold and strip accents so 'Dónde' and 'donde' compare equal"""
+    if text.isascii():
+        return text.lower()
+    return text.casefold().translate(_ACCENT_FOLDS)
+
+
+def tokenize(text):
+    """Set of normalized word tokens in a message"""
+    return set(TOKEN_PATTERN.findall(normalize_text(text)))
+
+
+class IntentMatcher:
+    """Maps a message to the highest-priority intent whose keyword it contains"""
+
+    def __init__(self, intents, fallback_response):
+        self.intent_names = tuple(intent['intent'] for intent in intents)
+        self.responses = tuple(intent['response'] for intent in intents)
+        self.fallback_response = fallback_response
+        self._keyword_priority = {}
+        for priority, intent in enumerate(intents):
+            for keyword in intent['keywords']:
+                for token in tokenize(keyword):
+                    self._keyword_priority.setdefault(token, priority)
+
+    def match(self, text):
+        """Index of the matched intent, or None"""
+        best = None
+        for token in tokenize(text):
+            priority = self._keyword_priority.get(token)
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    break
+        return best
+
+    def intent(self, text):
+        """Name of the matched intent, or 'general'"""
+        index = self.match(text)
+        return 'general' if index is None else self.intent_names[index]
+
+    def respond(self, text):
+        """Canned response for a message"""
+        index = self.match(text)
+        return self.fallback_response if index is None else self.responses[index]
+
+
+@functools.lru_cache(maxsize=PACK_CACHE_SIZE)
+def get_intent_matcher(language):
+    """Intent matcher for a language, compiled once per process"""
+    pack = load_language_pack(language)
+    return IntentMatcher(pack['intents'], pack['fallback_response'])
@@ -0,0 +1,69 @@
+"""Bounded background job queue for slow work triggered from the UI
+
+Script threads submit work and get a job ID back immediately; later reruns
+poll the job by ID instead of blocking a Streamlit worker while it runs.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+RESULT_TTL_SECONDS = 600
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue already holds its maximum number of jobs"""
+
+
+class JobQueue:
+    """Thread pool with a cap on queued + running jobs"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return its job ID"""
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Too many jobs in progress, please try again shortly")
+        self._purge_expired()
+        job_id = next(self._ids)
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._jobs[job_id] = [future, None]
+        future.add_done_callback(lambda _: self._finished(job_id))
+        return job_id
+
+    def done(self, job_id):
+        """True once the job has finished (or is unknown, e.g. expired)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job is None or job[0].done()
+
+    def pop_result(self, job_id):
+        """Return a finished job's result (re-raising its error) and forget it"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            raise KeyError(f"Unknown or expired job {job_id}")
+        return job[0].result()
+
+    def _finished(self, job_id):
+        self._slots.release()
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id][1] = time.monotonic()
+
+    def _purge_expired(self):
+        # Drop results nobody collected, e.g. from sessions that were closed
+        cutoff = time.monotonic() - RESULT_TTL_SECONDS
+        with self._lock:
+            expired = [job_id for job_id, (_, finished_at) in self._jobs.items()
+                       if finished_at is not None and finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,262 @@
+"""Opt-in rerun timing, exported in Prometheus text format
+
+Set LANGAPP_METRICS to a port number to serve http://127.0.0.1:PORT/metrics,
+or to a file path to have the metrics rewritten there every few seconds.
+When it is unset, `instrument` hands functions back undecorated and `timed`
+returns a shared no-op context manager, so the instrumented code pays about
+one attribute lookup per block.
+
+Profiling of a single rerun, with cProfile or pyinstrument, is only offered
+while metrics are enabled.
+"""
+import bisect
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from utils.content import DATA_DIR
+
+ENABLED = os.environ.get('LANGAPP_METRICS', 'off') not in ('', 'off')
+
+PROFILE_DIR = os.path.join(DATA_DIR, 'profiles')
+FILE_EXPORT_INTERVAL_SECONDS = 5.0
+# Upper bounds (seconds) of the histogram buckets, like Prometheus client defaults
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations for one label value"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class Registry:
+    """Counters and histograms keyed by (metric name, label value)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def increment(self, name, label, value, help_text, amount=1):
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            key = (name, label, value)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, label, value, help_text, seconds):
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            key = (name, label, value)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def render(self):
+        """Every metric in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            current = None
+            for (name, label, value), count in sorted(self._counters.items()):
+                if name != current:
+                    current = name
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                    lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name}{{{label}="{_escape(value)}"}} {count}')
+            for (name, label, value), histogram in sorted(self._histograms.items()):
+                if name != current:
+                    current = name
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                    lines.append(f'# TYPE {name} histogram')
+                labels = f'{label}="{_escape(value)}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY = Registry()
+
+
+class _Timer:
+    """Records the duration of a `with` block as a langapp_block_seconds sample"""
+
+    __slots__ = ('block', 'started')
+
+    def __init__(self, block):
+        self.block = block
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        REGISTRY.observe('langapp_block_seconds', 'block', self.block,
+                         "Time spent in an instrumented block of the script",
+                         time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(block):
+    """Context manager timing a block, e.g. `with metrics.timed('chart:weekly_points'):`"""
+    return _Timer(block) if ENABLED else _NULL_TIMER
+
+
+def instrument(block):
+    """Decorator timing every call of a function as `block`; a no-op when disabled"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def timed_call(*args, **kwargs):
+            with _Timer(block):
+                return fn(*args, **kwargs)
+        return timed_call
+    return decorate
+
+
+def count_rerun(page):
+    """Count one script run on a page"""
+    if ENABLED:
+        REGISTRY.increment('langapp_reruns_total', 'page', page, "Script reruns, by page shown")
+
+
+class FileExporter:
+    """Rewrites a .prom file (e.g. for node_exporter's textfile collector), at most every few seconds"""
+
+    def __init__(self, path, interval=FILE_EXPORT_INTERVAL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._written_at = 0.0
+
+    def flush(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._written_at < self.interval:
+                return
+            self._written_at = now
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(REGISTRY.render())
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+class HttpExporter:
+    """Serves /metrics on localhost from a daemon thread; scrapes always see live values"""
+
+    def __init__(self, port, host='127.0.0.1'):
+        # Deferred: http.server takes tens of milliseconds to import, and is
+        # only needed when metrics are served over HTTP
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = REGISTRY.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+
+    def flush(self):
+        pass
+
+
+def create_exporter(spec=None):
+    """Exporter for LANGAPP_METRICS: a port number serves HTTP, anything else is a file path"""
+    spec = spec or os.environ.get('LANGAPP_METRICS', 'off')
+    if spec in ('', 'off'):
+        return None
+    if spec.isdigit():
+        return HttpExporter(int(spec))
+    return FileExporter(spec)
+
+
+@contextmanager
+def profiled(profiler='cprofile', directory=PROFILE_DIR):
+    """Profile the body of a `with` block, yielding the path the profile is saved to
+
+    The profile is saved even when the block is cut short, as st.rerun and
+    st.stop do. pyinstrument writes an HTML report; cProfile (the fallback
+    when pyinstrument isn't installed) a .prof file for pstats or snakeviz.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, time.strftime('rerun-%Y%m%d-%H%M%S') + f'-{threading.get_ident()}')
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            profiler = 'cprofile'
+    if profiler == 'pyinstrument':
+        session = Profiler()
+        path = stem + '.html'
+        session.start()
+        try:
+            yield path
+        finally:
+            session.stop()
+            with open(path, 'w', encoding='utf-8') as report:
+                report.write(session.output_html())
+        return
+
+    import cProfile
+
+    session = cProfile.Profile()
+    path = stem + '.prof'
+    session.enable()
+    try:
+        yield path
+    finally:
+        session.disable()
+        session.dump_stats(path)
@@ -0,0 +1,89 @@
+"""Points ledger: every award goes through one place
+
+Each award names its source, which fixes the skill it counts toward, the
+default amount and a rate limit. The ledger keeps the total and per-skill
+and per-source sums up to date as awards are applied, so reading them never
+rescans history, and the individual (source, amount, timestamp) entries are
+appended to the profile store's event log by the caller.
+"""
+import threading
+from collections import namedtuple
+
+# Skills, in the order charts show them
+VOCABULARY = 'Vocabulary'
+PRONUNCIATION = 'Pronunciation'
+CONVERSATION = 'Conversation'
+CULTURAL_KNOWLEDGE = 'Cultural Knowledge'
+SKILLS = (VOCABULARY, PRONUNCIATION, CONVERSATION, CULTURAL_KNOWLEDGE)
+
+# Sources
+CONVERSATION_MESSAGE = 'conversation_message'
+CONVERSATION_PRONUNCIATION = 'conversation_pronunciation'
+PRONUNCIATION_PRACTICE = 'pronunciation_practice'
+WORD_MASTERED = 'word_mastered'
+VOCABULARY_QUIZ = 'vocabulary_quiz'
+CULTURAL_QUIZ = 'cultural_quiz'
+
+# points: default award; burst/per_seconds: at most `burst` awards per window, refilled evenly
+PointSource = namedtuple('PointSource', ('skill', 'points', 'burst', 'per_seconds'))
+
+POINT_SOURCES = {
+    CONVERSATION_MESSAGE: PointSource(CONVERSATION, 10, 20, 60),
+    # Graded sources pass their amount explicitly
+    CONVERSATION_PRONUNCIATION: PointSource(PRONUNCIATION, 0, 20, 60),
+    PRONUNCIATION_PRACTICE: PointSource(PRONUNCIATION, 0, 20, 60),
+    WORD_MASTERED: PointSource(VOCABULARY, 20, 30, 60),
+    VOCABULARY_QUIZ: PointSource(VOCABULARY, 5, 20, 60),
+    CULTURAL_QUIZ: PointSource(CULTURAL_KNOWLEDGE, 15, 20, 60),
+}
+
+# Smaller awards for a wrong answer, for trying
+VOCABULARY_QUIZ_MISS_POINTS = 2
+CULTURAL_QUIZ_MISS_POINTS = 5
+
+
+class PointsLedger:
+    """A learner's points with materialized total, per-skill and per-source sums"""
+
+    def __init__(self, total=0, by_skill=None, by_source=None, buckets=None, sources=POINT_SOURCES):
+        self.sources = sources
+        self.total = total
+        self.by_skill = dict(by_skill or {})
+        self.by_source = dict(by_source or {})
+        # Source -> (tokens left, last refill time), saved with the ledger so a
+        # page reload doesn't refill every bucket
+        self._buckets = {source: tuple(level) for source, level in (buckets or {}).items() if source in sources}
+        self._lock = threading.Lock()
+        # Bumped per credited award; rate-limited (refused) awards leave it alone
+        self.version = 0
+
+    def award(self, source, amount, now):
+        """Apply an award; returns the amount credited, 0 if the source is over its rate limit"""
+        rule = self.sources[source]
+        with self._lock:
+            tokens, updated = self._buckets.get(source, (rule.burst, now))
+            tokens = min(rule.burst, tokens + (now - updated) * rule.burst / rule.per_seconds)
+            if tokens < 1:
+                self._buckets[source] = (tokens, now)
+                return 0
+            self._buckets[source] = (tokens - 1, now)
+            self.total += amount
+            self.by_skill[rule.skill] = self.by_skill.get(rule.skill, 0) + amount
+            self.by_source[source] = self.by_source.get(source, 0) + amount
+            self.version += 1
+        return amount
+
+    def skill_totals(self):
+        """Points per skill, in SKILLS order"""
+        return tuple(self.by_skill.get(skill, 0) for skill in SKILLS)
+
+    def to_dict(self):
+        # A refused award only restates a bucket's level at a later time, so
+        # buckets saved after credited awards (version bumps) stay exact
+        with self._lock:
+            buckets = {source: list(level) for source, level in self._buckets.items()}
+        return {'total': self.total, 'by_skill': self.by_skill, 'by_source': self.by_source, 'buckets': buckets}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('total', 0), data.get('by_skill'), data.get('by_source'), data.get('buckets'))
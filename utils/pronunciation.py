@@ -0,0 +1,208 @@
+"""Pronunciation scoring: MFCC features and DTW alignment against a reference
+
+A learner's clip is decoded to mono 16 kHz, trimmed of leading and trailing
+silence, and turned into MFCC frames with vectorized NumPy (framing via
+strided views, one batched FFT, cached mel and DCT matrices). The frames are
+aligned with dynamic time warping against the reference recording's frames,
+which are computed once per reference file and cached, and the average
+aligned distance is mapped to a 0-100 score. Items without a recorded
+reference can be scored against the synthesized clip from the audio cache.
+"""
+import io
+import os
+import re
+import wave
+from concurrent.futures import TimeoutError as FutureTimeout
+from functools import lru_cache
+
+import numpy as np
+
+from utils.content import DATA_DIR
+from utils.intents import normalize_text
+from utils.reference_audio import RENDER_TIMEOUT_SECONDS, AudioUnavailable
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400  # 25 ms
+FRAME_STEP = 160  # 10 ms
+FFT_SIZE = 512
+MEL_BANDS = 26
+MFCC_COUNT = 13
+PRE_EMPHASIS = 0.97
+# Frames quieter than this fraction of the clip's peak frame energy count as silence
+SILENCE_THRESHOLD = 0.02
+MAX_CLIP_SECONDS = 15
+
+# Average aligned cosine distance that maps to 100 and to 0 points
+PERFECT_DISTANCE = 0.1
+FAILING_DISTANCE = 0.6
+
+REFERENCE_AUDIO_DIR = os.environ.get('LANGAPP_REFERENCE_AUDIO', os.path.join(DATA_DIR, 'reference_audio'))
+REFERENCE_CACHE_SIZE = 1024
+
+
+class PronunciationError(Exception):
+    """Raised when a recording cannot be scored"""
+
+
+class MissingReference(PronunciationError):
+    """Raised when there is no reference recording for a practice item"""
+
+
+def decode_wav(data):
+    """Decode PCM WAV bytes to mono float32 samples at SAMPLE_RATE"""
+    try:
+        with wave.open(io.BytesIO(data)) as clip:
+            channels = clip.getnchannels()
+            width = clip.getsampwidth()
+            rate = clip.getframerate()
+            frames = clip.readframes(min(clip.getnframes(), rate * MAX_CLIP_SECONDS))
+    except (wave.Error, EOFError) as exc:
+        raise PronunciationError(f"Unsupported recording: {exc}") from exc
+    if channels < 1 or len(frames) % (width * channels):
+        # A truncated file can end partway through a frame
+        raise PronunciationError("The recording is truncated or corrupt")
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise PronunciationError(f"Unsupported sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(samples):
+        # Linear interpolation is plenty for speech features below 8 kHz
+        duration = len(samples) / rate
+        target = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        samples = np.interp(target, np.arange(len(samples)) / rate, samples).astype(np.float32)
+    return samples
+
+
+def frame_signal(samples):
+    """Overlapping frames as a (frames, FRAME_LENGTH) strided view"""
+    if len(samples) < FRAME_LENGTH:
+        samples = np.pad(samples, (0, FRAME_LENGTH - len(samples)))
+    return np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::FRAME_STEP]
+
+
+@lru_cache(maxsize=None)
+def _window():
+    return np.hamming(FRAME_LENGTH).astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def _mel_filterbank():
+    """(MEL_BANDS, FFT_SIZE // 2 + 1) triangular filters spaced on the mel scale"""
+    def to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    edges = to_hz(np.linspace(to_mel(0), to_mel(SAMPLE_RATE / 2), MEL_BANDS + 2))
+    bins = np.fft.rfftfreq(FFT_SIZE, 1 / SAMPLE_RATE)
+    lower, centre, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (centre - lower)
+    falling = (upper - bins) / (upper - centre)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix():
+    """Orthonormal DCT-II basis, keeping the first MFCC_COUNT coefficients"""
+    n = np.arange(MEL_BANDS)
+    basis = np.cos(np.pi / MEL_BANDS * (n[None, :] + 0.5) * np.arange(MFCC_COUNT)[:, None])
+    basis *= np.sqrt(2 / MEL_BANDS)
+    basis[0] /= np.sqrt(2)
+    return basis.T.astype(np.float32)
+
+
+def mfcc(samples):
+    """MFCC frames (frames, MFCC_COUNT - 1) with silence trimmed and means removed"""
+    emphasized = np.append(samples[:1], samples[1:] - PRE_EMPHASIS * samples[:-1])
+    frames = frame_signal(emphasized) * _window()
+    power = np.abs(np.fft.rfft(frames, FFT_SIZE)) ** 2 / FFT_SIZE
+    energy = power.sum(axis=1)
+    voiced = np.flatnonzero(energy > SILENCE_THRESHOLD * energy.max()) if energy.max() > 0 else ()
+    if len(voiced) < 2:
+        raise PronunciationError("No speech detected in the recording")
+    power = power[voiced[0]:voiced[-1] + 1]
+    log_mel = np.log(power @ _mel_filterbank().T + 1e-10)
+    # Drop c0 (loudness) and normalize per clip so microphone gain doesn't matter
+    features = (log_mel @ _dct_matrix())[:, 1:]
+    return features - features.mean(axis=0)
+
+
+def dtw_distance(reference, attempt):
+    """Average cosine distance along the optimal DTW alignment of two feature sequences"""
+    ref = reference / (np.linalg.norm(reference, axis=1, keepdims=True) + 1e-10)
+    att = attempt / (np.linalg.norm(attempt, axis=1, keepdims=True) + 1e-10)
+    cost = 1 - ref @ att.T
+    rows, cols = cost.shape
+    # Row-by-row: D[i, j] = c[i, j] + min(D[i-1, j-1], D[i-1, j], D[i, j-1]). The
+    # horizontal term is a running minimum once each row is offset by its prefix
+    # sum, so every row is a handful of vectorized operations
+    previous = np.cumsum(cost[0])
+    for i in range(1, rows):
+        diagonal_or_up = np.minimum(previous, np.concatenate(([np.inf], previous[:-1])))
+        prefix = np.cumsum(cost[i])
+        shifted = np.concatenate(([0.0], prefix[:-1]))
+        previous = np.minimum.accumulate(diagonal_or_up - shifted) + prefix
+    return previous[-1] / (rows + cols)
+
+
+def distance_to_score(distance):
+    """Map an average aligned distance to a 0-100 score"""
+    fraction = (FAILING_DISTANCE - distance) / (FAILING_DISTANCE - PERFECT_DISTANCE)
+    return int(round(100 * min(1.0, max(0.0, fraction))))
+
+
+def slugify(text):
+    """File-name form of a word or phrase: 'Buenos días' -> 'buenos_dias'"""
+    return re.sub(r'\W+', '_', normalize_text(text)).strip('_')
+
+
+def reference_path(language, text):
+    """Where the reference recording for a word or phrase is expected"""
+    return os.path.join(REFERENCE_AUDIO_DIR, language.lower(), f"{slugify(text)}.wav")
+
+
+@lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def _reference_features(path, modified):
+    # mtime is part of the key so a re-recorded reference replaces the cached one
+    with open(path, 'rb') as reference:
+        features = mfcc(decode_wav(reference.read()))
+    features.setflags(write=False)
+    return features
+
+
+def synthesized_reference(audio_cache, language, text):
+    """Path of the synthesized clip for a practice item, rendering it if needed"""
+    try:
+        return audio_cache.request(language, text).result(timeout=RENDER_TIMEOUT_SECONDS)
+    except (AudioUnavailable, OSError, FutureTimeout) as exc:
+        raise MissingReference(f"No reference recording for '{text}' yet ({exc})") from exc
+
+
+def reference_features(language, text, audio_cache=None):
+    """Cached MFCC frames of the reference recording for a practice item
+
+    Without a recorded reference, the synthesized clip from `audio_cache` (an
+    AudioCache) stands in for it when one is given.
+    """
+    path = reference_path(language, text)
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        if audio_cache is None:
+            raise MissingReference(f"No reference recording for '{text}' yet") from None
+        path = synthesized_reference(audio_cache, language, text)
+        modified = os.stat(path).st_mtime_ns
+    return _reference_features(path, modified)
+
+
+def score_recording(language, text, audio, audio_cache=None):
+    """Score a learner's WAV recording of `text` against its reference, 0-100"""
+    reference = reference_features(language, text, audio_cache)
+    return distance_to_score(dtw_distance(reference, mfcc(decode_wav(audio))))
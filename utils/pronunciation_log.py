@@ -0,0 +1,97 @@
+"""Bounded history of pronunciation attempts with running statistics
+
+The most recent attempts live in a fixed-capacity ring buffer (typed arrays
+for scores and times), and lifetime aggregates are updated as each attempt
+is recorded, so memory and per-rerun cost stay constant however many
+attempts a learner makes.
+"""
+from array import array
+
+RECENT_ATTEMPT_LIMIT = 10
+
+
+class PronunciationLog:
+    """Ring buffer of recent attempts plus lifetime count, mean, max and per-item best"""
+
+    def __init__(self, capacity=RECENT_ATTEMPT_LIMIT):
+        self.capacity = capacity
+        self._scores = array('B', bytes(capacity))
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._kinds = [None] * capacity
+        self._items = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._recent_total = 0
+        self.count = 0
+        self.total = 0
+        self.max_score = 0
+        self.best = {}
+        # Bumped per recorded attempt, so the ring buffer is re-serialized only after one
+        self.version = 0
+
+    def __len__(self):
+        return self._size
+
+    def record(self, kind, item, score, timestamp):
+        """Add an attempt, evicting the oldest one once the buffer is full"""
+        slot = self._next
+        if self._size == self.capacity:
+            self._recent_total -= self._scores[slot]
+        else:
+            self._size += 1
+        self._scores[slot] = score
+        self._timestamps[slot] = timestamp
+        self._kinds[slot] = kind
+        self._items[slot] = item
+        self._next = (slot + 1) % self.capacity
+        self._recent_total += score
+        self.count += 1
+        self.total += score
+        self.max_score = max(self.max_score, score)
+        # Free-form practice has no item to track a best for
+        if item is not None and score > self.best.get(item, -1):
+            self.best[item] = score
+        self.version += 1
+
+    def mean(self):
+        """Lifetime average score"""
+        return self.total / self.count if self.count else 0.0
+
+    def recent_mean(self):
+        """Average score over the attempts still in the buffer"""
+        return self._recent_total / self._size if self._size else 0.0
+
+    def recent_scores(self):
+        """Scores in the buffer, oldest first"""
+        return tuple(self._scores[slot] for slot in self._slots())
+
+    def recent(self):
+        """(kind, item, score, timestamp) for each attempt in the buffer, oldest first"""
+        return [(self._kinds[slot], self._items[slot], self._scores[slot], self._timestamps[slot])
+                for slot in self._slots()]
+
+    def to_dict(self):
+        return {
+            'recent': self.recent(),
+            'count': self.count,
+            'total': self.total,
+            'max_score': self.max_score,
+            'best': self.best,
+        }
+
+    @classmethod
+    def from_dict(cls, data, capacity=RECENT_ATTEMPT_LIMIT):
+        log = cls(capacity)
+        for kind, item, score, timestamp in data.get('recent', []):
+            log.record(kind, item, score, timestamp)
+        # Lifetime aggregates cover attempts that have since left the buffer
+        log.count = data.get('count', log.count)
+        log.total = data.get('total', log.total)
+        log.max_score = data.get('max_score', log.max_score)
+        log.best = dict(data.get('best', log.best))
+        log.version = 0
+        return log
+
+    def _slots(self):
+        start = (self._next - self._size) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self._size)]
@@ -0,0 +1,85 @@
+"""Vocabulary quiz generation with precomputed distractor pools
+
+Wrong answers for each word are chosen ahead of time from translations in
+the same category with a similar length, so they look plausible. Building a
+batch of questions is then a few random draws per question, with no scanning
+of the vocabulary.
+"""
+import random
+
+DEFAULT_CHOICES = 4
+# Candidates kept per word; larger pools give more varied wrong answers
+DISTRACTOR_POOL_SIZE = 8
+
+
+class QuizGenerator:
+    """Multiple-choice translation questions for one language's vocabulary"""
+
+    def __init__(self, index, choices=DEFAULT_CHOICES, pool_size=DISTRACTOR_POOL_SIZE):
+        if index.translations is None:
+            raise ValueError("Quiz generation needs a vocabulary index with translations")
+        self.index = index
+        self.choices = choices
+        language_pool = None
+        # Indexed by position in index.words; questions report the stable word ID
+        self.distractor_pools = [None] * index.total_words
+        for category in index.categories:
+            start, end = index.category_offsets[category]
+            category_pool = self._length_neighbours(range(start, end))
+            for word_id in range(start, end):
+                pool = self._distinct(word_id, category_pool[word_id], pool_size)
+                if len(pool) < choices - 1:
+                    # Small categories borrow similar-length words from the rest of the language
+                    if language_pool is None:
+                        language_pool = self._length_neighbours(range(index.total_words))
+                    pool = self._distinct(word_id, category_pool[word_id] + language_pool[word_id], pool_size)
+                self.distractor_pools[word_id] = tuple(pool)
+
+    def generate(self, category=None, count=5, seed=None):
+        """A batch of questions drawn from one category (or all words), reproducible by seed"""
+        rng = random.Random(seed)
+        if category is None:
+            candidates = range(self.index.total_words)
+        else:
+            start, end = self.index.category_offsets[category]
+            candidates = range(start, end)
+        questions = []
+        for position in rng.sample(candidates, min(count, len(candidates))):
+            pool = self.distractor_pools[position]
+            distractors = rng.sample(pool, min(self.choices - 1, len(pool)))
+            options = [self.index.translations[position]] + [self.index.translations[other] for other in distractors]
+            rng.shuffle(options)
+            questions.append({
+                'word_id': self.index.ids[position],
+                'word': self.index.words[position],
+                'options': options,
+                'answer': options.index(self.index.translations[position])
+            })
+        return questions
+
+    def _length_neighbours(self, word_ids):
+        """For each word, the other words ordered by how close their translation length is"""
+        translations = self.index.translations
+        ordered = sorted(word_ids, key=lambda word_id: len(translations[word_id]))
+        neighbours = {}
+        window = DISTRACTOR_POOL_SIZE * 2
+        for position, word_id in enumerate(ordered):
+            nearby = ordered[max(0, position - window):position] + ordered[position + 1:position + 1 + window]
+            length = len(translations[word_id])
+            nearby.sort(key=lambda other: abs(len(translations[other]) - length))
+            neighbours[word_id] = nearby
+        return neighbours
+
+    def _distinct(self, word_id, candidates, limit):
+        """Up to `limit` candidates whose translations differ from the answer and each other"""
+        translations = self.index.translations
+        seen = {translations[word_id].casefold()}
+        pool = []
+        for other in candidates:
+            key = translations[other].casefold()
+            if key not in seen:
+                seen.add(key)
+                pool.append(other)
+                if len(pool) == limit:
+                    break
+        return pool
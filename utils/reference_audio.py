@@ -0,0 +1,165 @@
+"""Content-addressed on-disk cache of pronunciation audio
+
+Clips are stored under the SHA-256 of (synthesizer, language, text), so a
+change of voice or engine never serves a stale clip and identical requests
+from any session share one file. Cached clips are read through read-only
+memory maps, letting the OS page cache hold one copy for every worker.
+Missing clips render in the background, and concurrent requests for the same
+clip wait on a single render.
+"""
+import hashlib
+import mmap
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.content import DATA_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, 'audio_cache')
+DEFAULT_RENDER_WORKERS = 2
+# Memory maps kept open for recently played clips
+OPEN_CLIP_LIMIT = 64
+RENDER_TIMEOUT_SECONDS = 30
+
+ESPEAK_VOICES = {
+    'Spanish': 'es',
+    'French': 'fr',
+    'German': 'de',
+    'Italian': 'it',
+    'Portuguese': 'pt',
+}
+
+
+class AudioUnavailable(Exception):
+    """Raised when a clip cannot be rendered"""
+
+
+class Synthesizer:
+    """Renders a word or phrase to WAV bytes"""
+
+    # Part of every cache key; include anything that changes the rendered audio
+    name = None
+
+    def render(self, language, text):
+        raise NotImplementedError
+
+
+class EspeakSynthesizer(Synthesizer):
+    """Local text-to-speech through the espeak-ng command line tool"""
+
+    def __init__(self, binary='espeak-ng', speed=140):
+        self.binary = binary
+        self.speed = speed
+        # Which binary, and which release of it, so switching LANGAPP_TTS or
+        # upgrading espeak-ng renders fresh clips instead of serving old ones
+        resolved = shutil.which(binary)
+        self.name = f"espeak:{os.path.realpath(resolved) if resolved else binary}:{self._version()}:{speed}"
+
+    def _version(self):
+        try:
+            result = subprocess.run([self.binary, '--version'], capture_output=True,
+                                    timeout=RENDER_TIMEOUT_SECONDS, check=True)
+        except (OSError, subprocess.SubprocessError):
+            return 'unknown'
+        # e.g. "eSpeak NG text-to-speech: 1.51  Data at: ..."
+        return result.stdout.decode('utf-8', 'replace').strip().partition('\n')[0]
+
+    def render(self, language, text):
+        voice = ESPEAK_VOICES.get(language)
+        if voice is None:
+            raise AudioUnavailable(f"No {language} voice is configured")
+        try:
+            result = subprocess.run(
+                [self.binary, '-v', voice, '-s', str(self.speed), '--stdout', text],
+                capture_output=True, timeout=RENDER_TIMEOUT_SECONDS, check=True
+            )
+        except (OSError, subprocess.SubprocessError) as exc:
+            raise AudioUnavailable(f"Speech synthesis failed: {exc}") from exc
+        return result.stdout
+
+
+class AudioCache:
+    """Pre-rendered clips on disk, rendered on demand by a synthesizer"""
+
+    def __init__(self, directory, synthesizer, max_workers=DEFAULT_RENDER_WORKERS):
+        self.directory = directory
+        self.synthesizer = synthesizer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio-render")
+        self._rendering = {}
+        self._open_clips = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, language, text):
+        return hashlib.sha256('\0'.join((self.synthesizer.name, language, text)).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.wav")
+
+    def get(self, language, text):
+        """Read-only memory map of a cached clip, or None if it isn't rendered yet"""
+        path = self.path(self.key(language, text))
+        with self._lock:
+            clip = self._open_clips.get(path)
+            if clip is not None:
+                self._open_clips.move_to_end(path)
+                return clip
+        try:
+            with open(path, 'rb') as clip_file:
+                clip = mmap.mmap(clip_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._open_clips[path] = clip
+            # Evicted maps are not closed here: a reader may still hold them,
+            # and they are released once the last reference goes away
+            while len(self._open_clips) > OPEN_CLIP_LIMIT:
+                self._open_clips.popitem(last=False)
+        return clip
+
+    def request(self, language, text):
+        """Future that resolves once a clip is on disk; one render per clip at a time"""
+        key = self.key(language, text)
+        with self._lock:
+            future = self._rendering.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._render, key, language, text)
+            self._rendering[key] = future
+        # Outside the lock: a render that has already finished (a synthesizer
+        # that fails at once, say) runs the callback right here, and it locks
+        future.add_done_callback(lambda _: self._finished(key))
+        return future
+
+    def _finished(self, key):
+        with self._lock:
+            self._rendering.pop(key, None)
+
+    def _render(self, key, language, text):
+        path = self.path(key)
+        if os.path.exists(path):
+            return path
+        audio = self.synthesizer.render(language, text)
+        if not audio:
+            raise AudioUnavailable("The synthesizer produced no audio")
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # Write then rename, so readers never map a half-written clip
+        handle, temporary = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as clip_file:
+                clip_file.write(audio)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        return path
+
+
+def create_audio_cache():
+    """Cache configured by the LANGAPP_AUDIO_CACHE and LANGAPP_TTS environment variables"""
+    directory = os.environ.get('LANGAPP_AUDIO_CACHE', DEFAULT_CACHE_DIR)
+    return AudioCache(directory, EspeakSynthesizer(os.environ.get('LANGAPP_TTS', 'espeak-ng')))
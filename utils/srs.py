@@ -0,0 +1,150 @@
+"""SM-2 spaced-repetition scheduler backed by compact parallel arrays
+
+Per-card state (word ID, ease, interval, due time, repetitions, lapses) lives
+in typed `array` columns, about 24 bytes per card. An indexed binary min-heap
+over due times (two more uint32 columns) answers "next card due" in O(1) and
+reschedules a reviewed card in O(log n) without leaving stale entries behind.
+"""
+import base64
+from array import array
+
+SECONDS_PER_DAY = 86400
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# Cards graded below this SM-2 quality are relearned from scratch
+PASSING_QUALITY = 3
+RELEARN_INTERVAL_DAYS = 10 / 1440
+
+# Column name -> array typecode; order defines the serialized layout
+COLUMNS = (
+    ('word_ids', 'I'),
+    ('ease', 'f'),
+    ('interval', 'f'),
+    ('due', 'd'),
+    ('reps', 'H'),
+    ('lapses', 'H'),
+)
+
+
+class ReviewScheduler:
+    """Review queue for one language's vocabulary, keyed by word ID"""
+
+    def __init__(self):
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self._card_of = {}
+        self._heap = array('I')
+        self._heap_pos = array('I')
+        # Bumped on every mutation so callers can skip re-serializing unchanged state
+        self.version = 0
+
+    def __len__(self):
+        return len(self.word_ids)
+
+    def __contains__(self, word_id):
+        return word_id in self._card_of
+
+    def add(self, word_id, now):
+        """Start reviewing a word; it is due immediately. No-op if already scheduled"""
+        if word_id in self._card_of:
+            return False
+        card = len(self.word_ids)
+        self._card_of[word_id] = card
+        self.word_ids.append(word_id)
+        self.ease.append(INITIAL_EASE)
+        self.interval.append(0.0)
+        self.due.append(now)
+        self.reps.append(0)
+        self.lapses.append(0)
+        self._heap_pos.append(len(self._heap))
+        self._heap.append(card)
+        self._sift_up(len(self._heap) - 1)
+        self.version += 1
+        return True
+
+    def next_due(self, now):
+        """Word ID of the most overdue card, or None if nothing is due yet"""
+        if not self._heap or self.due[self._heap[0]] > now:
+            return None
+        return self.word_ids[self._heap[0]]
+
+    def next_due_time(self):
+        """Epoch seconds when the next card becomes due, or None if empty"""
+        return self.due[self._heap[0]] if self._heap else None
+
+    def review(self, word_id, quality, now):
+        """Apply an SM-2 grade (0-5) to a card and reschedule it"""
+        card = self._card_of[word_id]
+        if quality < PASSING_QUALITY:
+            self.reps[card] = 0
+            self.lapses[card] = min(self.lapses[card] + 1, 0xFFFF)
+            interval = RELEARN_INTERVAL_DAYS
+        else:
+            reps = min(self.reps[card] + 1, 0xFFFF)
+            self.reps[card] = reps
+            if reps == 1:
+                interval = 1.0
+            elif reps == 2:
+                interval = 6.0
+            else:
+                interval = self.interval[card] * self.ease[card]
+        miss = 5 - quality
+        self.ease[card] = max(MIN_EASE, self.ease[card] + 0.1 - miss * (0.08 + miss * 0.02))
+        self.interval[card] = interval
+        self._reschedule(card, now + interval * SECONDS_PER_DAY)
+        self.version += 1
+
+    def to_dict(self):
+        """JSON-friendly snapshot: each column as base64 of its raw bytes"""
+        return {name: base64.b64encode(getattr(self, name).tobytes()).decode('ascii') for name, _ in COLUMNS}
+
+    @classmethod
+    def from_dict(cls, data):
+        scheduler = cls()
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            column.frombytes(base64.b64decode(data.get(name, '')))
+            setattr(scheduler, name, column)
+        scheduler._card_of = {word_id: card for card, word_id in enumerate(scheduler.word_ids)}
+        scheduler._heap = array('I', range(len(scheduler.word_ids)))
+        scheduler._heap_pos = array('I', range(len(scheduler.word_ids)))
+        for position in range(len(scheduler._heap) // 2 - 1, -1, -1):
+            scheduler._sift_down(position)
+        return scheduler
+
+    def _reschedule(self, card, due):
+        old_due = self.due[card]
+        self.due[card] = due
+        position = self._heap_pos[card]
+        if due < old_due:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._heap_pos[heap[i]] = i
+        self._heap_pos[heap[j]] = j
+
+    def _sift_up(self, position):
+        heap, due = self._heap, self.due
+        while position > 0:
+            parent = (position - 1) // 2
+            if due[heap[parent]] <= due[heap[position]]:
+                break
+            self._swap(parent, position)
+            position = parent
+
+    def _sift_down(self, position):
+        heap, due = self._heap, self.due
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and due[heap[child]] < due[heap[smallest]]:
+                    smallest = child
+            if smallest == position:
+                break
+            self._swap(position, smallest)
+            position = smallest
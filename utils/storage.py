@@ -0,0 +1,244 @@
+"""Persistent learner state with write-behind batching
+
+Session state is loaded from a backend once per session and written back
+asynchronously: every rerun only *stages* a JSON snapshot in memory, and a
+background thread flushes all staged snapshots in a single transaction.
+Repeated mutations to the same key between flushes coalesce into one write.
+Append-only activity events ride along in the same batched transaction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'learners.db')
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_MAX_PENDING = 500
+
+
+class StateBackend:
+    """Interface for durable key/value storage of per-user state"""
+
+    def read_all(self, user_id):
+        """Return {key: json_text} for every key stored for a user"""
+        raise NotImplementedError
+
+    def write_batch(self, rows, events=()):
+        """Persist (user_id, key, json_text, updated_at) state rows and
+        append (user_id, timestamp, kind, amount) event rows atomically"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class MemoryBackend(StateBackend):
+    """Process-local backend, useful for demos and load tests"""
+
+    def __init__(self):
+        self._rows = {}
+        self._events = []
+        self._lock = threading.Lock()
+
+    def read_all(self, user_id):
+        with self._lock:
+            return dict(self._rows.get(user_id, {}))
+
+    def write_batch(self, rows, events=()):
+        with self._lock:
+            for user_id, key, text, _ in rows:
+                self._rows.setdefault(user_id, {})[key] = text
+            self._events.extend(events)
+
+
+class SQLiteBackend(StateBackend):
+    """SQLite backend running in WAL mode"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS user_state (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (user_id, key)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS activity_events (
+                user_id TEXT NOT NULL,
+                ts REAL NOT NULL,
+                kind TEXT NOT NULL,
+                amount REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activity_events_user_ts ON activity_events (user_id, ts)")
+
+    def read_all(self, user_id):
+        with self._lock:
+            cursor = self._conn.execute("SELECT key, value FROM user_state WHERE user_id = ?", (user_id,))
+            return dict(cursor.fetchall())
+
+    def write_batch(self, rows, events=()):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO user_state (user_id, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    rows
+                )
+                self._conn.executemany(
+                    "INSERT INTO activity_events (user_id, ts, kind, amount) VALUES (?, ?, ?, ?)",
+                    events
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                # Never leave the shared connection inside an open transaction
+                # (SQLite has already rolled back after some failures, e.g. disk full)
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ProfileStore:
+    """Loads learner state once and flushes staged changes in the background"""
+
+    def __init__(self, backend, flush_interval=DEFAULT_FLUSH_INTERVAL, max_pending=DEFAULT_MAX_PENDING):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        # Snapshots taken by a flush that is still writing them
+        self._in_flight = {}
+        self._events = []
+        # user_id -> {key: digest of the last snapshot staged or loaded}
+        self._digests = {}
+        # Users staged or loaded since the last flush; the others' digests are dropped
+        self._active = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="profile-store-flusher", daemon=True)
+        self._thread.start()
+
+    def load(self, user_id):
+        """Return the saved state for a user as {key: value}"""
+        with self._lock:
+            # A batch being written right now is newer than what the backend returns
+            staged = {key: text for (uid, key), text in self._in_flight.items() if uid == user_id}
+            staged.update((key, text) for (uid, key), text in self._pending.items() if uid == user_id)
+        stored = self.backend.read_all(user_id)
+        stored.update(staged)
+        state = {}
+        with self._lock:
+            digests = self._digests.setdefault(user_id, {})
+            self._active.add(user_id)
+            for key, text in stored.items():
+                digests.setdefault(key, _digest(text))
+        for key, text in stored.items():
+            state[key] = json.loads(text)
+        return state
+
+    def stage(self, user_id, key, value):
+        """Queue a snapshot for the next flush; returns False if unchanged"""
+        text = json.dumps(value, separators=(',', ':'), sort_keys=True)
+        digest = _digest(text)
+        with self._lock:
+            self._active.add(user_id)
+            digests = self._digests.setdefault(user_id, {})
+            if digests.get(key) == digest:
+                return False
+            digests[key] = digest
+            self._pending[(user_id, key)] = text
+            if len(self._pending) + len(self._events) >= self.max_pending:
+                self._wake.set()
+        return True
+
+    def append_event(self, user_id, timestamp, kind, amount=1):
+        """Queue an activity event for the append-only log"""
+        with self._lock:
+            self._events.append((user_id, timestamp, kind, amount))
+            if len(self._pending) + len(self._events) >= self.max_pending:
+                self._wake.set()
+
+    def flush(self):
+        """Write all staged snapshots and queued events in one batch"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                events, self._events = self._events, []
+                self._in_flight = pending
+                # Learners who went quiet for a whole interval have left; forget their digests
+                for user_id in self._digests.keys() - self._active:
+                    del self._digests[user_id]
+                self._active = set()
+            if not pending and not events:
+                return 0
+            now = time.time()
+            rows = [(user_id, key, text, now) for (user_id, key), text in pending.items()]
+            try:
+                self.backend.write_batch(rows, events)
+            except Exception:
+                # Put the batch back unless newer snapshots superseded it
+                with self._lock:
+                    for slot, text in pending.items():
+                        self._pending.setdefault(slot, text)
+                    self._events[:0] = events
+                    self._in_flight = {}
+                raise
+            with self._lock:
+                self._in_flight = {}
+            return len(rows) + len(events)
+
+    def close(self):
+        """Stop the flusher thread after writing everything still staged"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        self.backend.close()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the flusher alive; the batch was re-queued for retry
+                time.sleep(self.flush_interval)
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def create_backend(spec=None):
+    """Build a backend from a spec: 'memory', 'sqlite' or a SQLite file path"""
+    spec = spec or os.environ.get('LANGAPP_STORE', 'sqlite')
+    if spec == 'memory':
+        return MemoryBackend()
+    if spec == 'sqlite':
+        return SQLiteBackend(os.environ.get('LANGAPP_DB_PATH', DEFAULT_DB_PATH))
+    return SQLiteBackend(spec)
@@ -0,0 +1,97 @@
+"""Day streaks and time practiced today, updated as activity happens
+
+Days are the learner's local calendar days, in their chosen timezone. Each
+activity event updates a few counters, so reading the streak or today's
+minutes is O(1) on every rerun, with no scan of past activity.
+"""
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from utils import activity
+
+
+def learner_timezone(name):
+    """tzinfo for an IANA timezone name; None (server local time) if unset or unknown"""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def learner_now(timezone_name):
+    """Current time in the learner's timezone"""
+    return datetime.now(learner_timezone(timezone_name))
+
+
+class StreakTracker:
+    """Consecutive active days, plus seconds practiced on the current day"""
+
+    def __init__(self, current=0, longest=0, last_active=None, today=None, today_seconds=0.0):
+        self.current = current
+        self.longest = longest
+        self.last_active = last_active
+        self.today = today
+        self.today_seconds = today_seconds
+
+    def record_activity(self, day):
+        """Count a local day as active; returns True if that extended the streak"""
+        if self.last_active is not None and day <= self.last_active:
+            return False
+        if self.last_active == day - timedelta(days=1):
+            self.current += 1
+        else:
+            self.current = 1
+        self.longest = max(self.longest, self.current)
+        self.last_active = day
+        return True
+
+    def add_time(self, day, seconds):
+        """Credit practice time to a local day"""
+        if self.today != day:
+            if self.today is not None and day < self.today:
+                return
+            self.today = day
+            self.today_seconds = 0.0
+        self.today_seconds += seconds
+
+    def streak(self, today):
+        """Streak as of today; it lapses once a whole day passes with no activity"""
+        if self.last_active is None or (today - self.last_active).days > 1:
+            return 0
+        return self.current
+
+    def seconds_today(self, today):
+        return self.today_seconds if self.today == today else 0.0
+
+    def to_dict(self):
+        return {
+            'current': self.current,
+            'longest': self.longest,
+            'last_active': self.last_active.isoformat() if self.last_active else None,
+            'today': self.today.isoformat() if self.today else None,
+            'today_seconds': self.today_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        last_active = data.get('last_active')
+        today = data.get('today')
+        return cls(
+            data.get('current', 0),
+            data.get('longest', 0),
+            date.fromisoformat(last_active) if last_active else None,
+            date.fromisoformat(today) if today else None,
+            data.get('today_seconds', 0.0)
+        )
+
+    @classmethod
+    def from_rollups(cls, rollups, today):
+        """One-off rebuild from daily rollups, for profiles saved before streaks were tracked"""
+        tracker = cls()
+        # Time alone (e.g. an idle open tab) doesn't make a day active
+        for day in rollups.active_days(ignore=(activity.TIME_SPENT,)):
+            tracker.record_activity(day)
+        tracker.add_time(today, rollups.total(today, activity.TIME_SPENT))
+        return tracker
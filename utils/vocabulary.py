@@ -0,0 +1,128 @@
+"""Precomputed vocabulary indexes and per-language mastery tracking"""
+import base64
+
+RECENT_MASTERED_LIMIT = 5
+
+
+class VocabularyIndex:
+    """Flattened, read-only view of one language's vocabulary categories
+
+    Words are stored by position in the flattened list, but everything that is
+    persisted (mastery bitmaps, review queues) uses the pack's stable word IDs,
+    so adding, removing or reordering words never remaps a learner's progress.
+    """
+
+    def __init__(self, vocabulary, translations=None, word_ids=None):
+        self.categories = tuple(vocabulary)
+        words = []
+        english = []
+        self.category_offsets = {}
+        self.category_words = {}
+        for category in self.categories:
+            start = len(words)
+            words.extend(vocabulary[category])
+            if translations is not None:
+                category_translations = translations.get(category, ())
+                if len(category_translations) != len(vocabulary[category]):
+                    raise ValueError(f"Category '{category}' has {len(vocabulary[category])} words "
+                                     f"but {len(category_translations)} translations")
+                english.extend(category_translations)
+            self.category_offsets[category] = (start, len(words))
+            self.category_words[category] = tuple(words[start:])
+        self.words = tuple(words)
+        # English translation of each word, parallel to self.words (None without translations)
+        self.translations = tuple(english) if translations is not None else None
+        if word_ids is None:
+            # Packs without an ID table fall back to positions, which shift when the pack is edited
+            word_ids = {word: position for position, word in reversed(list(enumerate(self.words)))}
+        missing = [word for word in self.words if word not in word_ids]
+        if missing:
+            raise ValueError(f"Words without a stable ID: {', '.join(missing)} "
+                             "(run scripts/assign_word_ids.py)")
+        # Stable ID of each word, parallel to self.words
+        self.ids = tuple(word_ids[word] for word in self.words)
+        # Every word ever given an ID, including ones since removed from the pack
+        self._word_of_id = {word_id: word for word, word_id in word_ids.items()}
+        self.word_category = {}
+        self.word_ids = {}
+        for category in self.categories:
+            for word in self.category_words[category]:
+                self.word_category.setdefault(word, category)
+        for word, word_id in zip(self.words, self.ids):
+            self.word_ids.setdefault(word, word_id)
+        self.category_counts = {category: len(self.category_words[category]) for category in self.categories}
+        self.total_words = len(self.words)
+
+    def __len__(self):
+        return self.total_words
+
+    def word_id(self, category, index):
+        """Stable ID of the word at a position within a category"""
+        return self.ids[self.category_offsets[category][0] + index]
+
+    def word(self, word_id):
+        """Word for a stable ID, or None if the ID was never assigned"""
+        return self._word_of_id.get(word_id)
+
+
+class MasteredVocabulary:
+    """Mastered word IDs as one bitmap per language, with O(1) membership and counts"""
+
+    def __init__(self):
+        self._bitmaps = {}
+        self._counts = {}
+        self._recent = {}
+        # Bumped when a word is mastered; persistence re-encodes the bitmaps only then
+        self.version = 0
+
+    def add(self, language, word_id):
+        """Mark a word as mastered; returns False if it already was"""
+        bitmap = self._bitmaps.setdefault(language, bytearray())
+        byte, bit = divmod(word_id, 8)
+        if byte >= len(bitmap):
+            bitmap.extend(bytes(byte + 1 - len(bitmap)))
+        elif bitmap[byte] & (1 << bit):
+            return False
+        bitmap[byte] |= 1 << bit
+        self._counts[language] = self._counts.get(language, 0) + 1
+        recent = self._recent.setdefault(language, [])
+        recent.append(word_id)
+        del recent[:-RECENT_MASTERED_LIMIT]
+        self.version += 1
+        return True
+
+    def contains(self, language, word_id):
+        bitmap = self._bitmaps.get(language)
+        byte, bit = divmod(word_id, 8)
+        return bitmap is not None and byte < len(bitmap) and bool(bitmap[byte] & (1 << bit))
+
+    def count(self, language):
+        """Words mastered in one language"""
+        return self._counts.get(language, 0)
+
+    def total(self):
+        """Words mastered across all languages"""
+        return sum(self._counts.values())
+
+    def recent(self, language):
+        """Most recently mastered word IDs in a language, oldest first"""
+        return list(self._recent.get(language, ()))
+
+    def to_dict(self):
+        return {
+            language: {
+                'bitmap': base64.b64encode(bytes(bitmap)).decode('ascii'),
+                'recent': self._recent.get(language, [])
+            }
+            for language, bitmap in self._bitmaps.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        mastered = cls()
+        for language, entry in data.items():
+            bitmap = bytearray(base64.b64decode(entry['bitmap']))
+            mastered._bitmaps[language] = bitmap
+            mastered._counts[language] = sum(bin(byte).count('1') for byte in bitmap)
+            mastered._recent[language] = list(entry.get('recent', []))
+        return mastered